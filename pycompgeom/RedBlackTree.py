@@ -1,199 +1,797 @@
-from BinarySearchTree import BinarySearchTree as _BinarySearchTree
-
 _DEBUG = 0
 
-def _identifyNephews(sibling, parent):
-    if sibling == parent.getLeft():
-        return sibling.getRight(),sibling.getLeft()
-    else:
-        return sibling.getLeft(),sibling.getRight()
-
 
-class RedBlackTree(_BinarySearchTree):
+class RedBlackTree(object):
     """A red-black tree for storing arbitrary (key,data) pairs.
 
     This particular implementation relies upon storing all data at
-    leaves of the tree rather than at internal nodes.
+    leaves of the tree rather than at internal nodes.  At all times it
+    guarantees that an internal node's key is precisely that of the
+    rightmost leaf in the left subtree.
 
     Entries with equal keys will be stored consolidated at a single leaf.
+
+    Nodes keep a pointer to their parent, so that searches, updates and
+    traversals walk the tree iteratively without recording their path.
     """
 
     #####################################################################
-    class _Node(_BinarySearchTree._Node):
+    class _Node(object):
         """Structure for single node of tree.
 
-        Each node has a key, a left child and a right child.
-
-        Data is stored at leaves and as complete hack, we designate
-        this by having left and right pointers equal, and pointing to
-        the data.
+        A leaf holds the list of data entries for its key; an internal
+        node has data None and two children.  Leaves are always black.
+        With a key function, order caches the key function's value for
+        key, valid while stamp matches the stamp of the tree.  In a tree
+        with ranks, size is the number of entries below the node.
         """
-        def __init__(self, key=None):
-            """Creates a leaf with no data entries.
+        __slots__ = ('key', 'order', 'stamp', 'left', 'right', 'parent', 'black', 'data', 'size')
 
-            key is None if not otherwise specified.
-            color is initially black.
-            """
-            _BinarySearchTree._Node.__init__(self,key)   # parent constructor
-            self._black = True
+        def __init__(self, key=None, data=None, parent=None, order=None, stamp=0):
+            self.key = key
+            self.order = order
+            self.stamp = stamp
+            self.left = self.right = None
+            self.parent = parent
+            self.black = True
+            self.data = data
 
-        def isBlack(self):
-            return self._black
+        def isInternal(self):
+            return self.data is None
 
-        def isRed(self):
-            return not self._black
-
-        def setBlack(self,yes=True):
-            self._black = yes
+        def isExternal(self):
+            return self.data is not None
 
         def __str__(self):
-            if self._black:
-                color = 'black'
-            else:
-                color = 'red'
-            return _BinarySearchTree._Node.__str__(self) + " and color %s"%color
-        
+            kind = 'Internal' if self.data is None else 'External'
+            color = 'black' if self.black else 'red'
+            return '%s with key %s and color %s' % (kind, str(self.key), color)
+
     #####################################################################
 
-    
-    def _fixupInsert(self, path):
-        path.pop()                    # end should be a leaf (black by default)
-        if path:
-            path[-1].setBlack(False)  # this presumed new internal should be set to red
-            good = False
-            while not good:
-                good = True               # generally the case
-                if len(path) == 1:
-                    path[-1].setBlack()   # root should be black
+    def __init__(self, cmp=cmp, key=None, sweep=False, ranks=False):
+        """Creates a new (empty) RedBlackTree.
+
+        cmp   A callable comparator for keys (default: built-in cmp)
+
+              During searches, the implementation guarantees that the
+              search key is the first of the two parameters sent to
+              comparator.
+
+        key   A callable mapping keys to values ordered by the built-in
+              comparisons, used before cmp: keys with equal values are
+              ordered by cmp, so only keys that cmp finds equal share a
+              leaf.  The value of every key in the tree is computed once
+              and stored in its nodes, and a search computes the value of
+              its key once.
+
+        sweep If True, key is called as key(k, position) against the
+              position last given to setPosition, as for the status of
+              a plane sweep.  Stored values are recomputed lazily, the
+              first time a search meets them after the position moved.
+
+        ranks If True, every node counts the entries below it, for rank,
+              select and count_range in O(log n) time.
+        """
+        self._cmp = cmp
+        self._ranks = ranks
+        self._size = 0
+        self._root = None
+        self._stamp = 0
+        self._position = None
+        if key is None:
+            self._order = None
+        elif sweep:
+            self._order = lambda k: key(k, self._position)
+        else:
+            self._order = key
+
+    def setPosition(self, position):
+        """Moves the sweep to position; stored key values become stale
+        unless the position did not change.
+        """
+        if position != self._position:
+            self._position = position
+            self._stamp += 1
+
+    def getPosition(self):
+        return self._position
+
+    def __len__(self):
+        """Returns number of (key,data) entries within the collection."""
+        return self._size
+
+    def _locate(self, key):
+        """Returns the leaf reached by searching for key, None if empty,
+        and the comparison of key with the key of that leaf.
+
+        That is the leaf with the smallest key not less than key, or the
+        rightmost leaf if there is none.  With a key function, also
+        returns the value of key.
+        """
+        walk = self._root
+        if walk is None:
+            return None, 0, None
+        compare = self._cmp
+        if self._order is None:
+            while walk.data is None:
+                if compare(key, walk.key) > 0:
+                    walk = walk.right
                 else:
-                    parent = path[-2]
-                    if parent.isRed():
-                        grandparent = path[-3]   # must exist, since root is never red
-                        uncle = grandparent.getOtherChild(parent)
-                        if uncle.isBlack():
-                            if _DEBUG>1: print "misshapen 4-node"
-                            # poorly shaped 4-node
-                            if (grandparent.getLeft() == parent) != (parent.getLeft() == path[-1]):
-                                # crooked alignment requires extra rotation
-                                if _DEBUG>1: print "extra rotate"
-                                self._rotate(path[-1],parent,grandparent)
-                                path[-2:] = [path[-1], path[-2]]  # invert last two entries
-                                if _DEBUG>1: print "extra rotate"
-                            # in either case, need to rotate parent with grandparent
-                            grandparent.setBlack(False)
-                            path[-2].setBlack(True)
-                            path[-1].setBlack(False)
-                            if len(path)==3:
-                                if _DEBUG>1: print "rotate (no grandparent)"
-                                self._rotate(path[-2],path[-3])
-                            else:
-                                if _DEBUG>1: print "rotate"
-                                self._rotate(path[-2],path[-3],path[-4])
-                        else:
-                            # 5-node must be recolored
-                            if _DEBUG>1: print "recoloring 5-node"
-                            parent.setBlack()
-                            uncle.setBlack()
-                            grandparent.setBlack(False)
-                            # continue from grandparent
-                            path.pop()
-                            path.pop()
-                            good = False
+                    walk = walk.left
+            return walk, compare(key, walk.key), None
+        order = self._order
+        stamp = self._stamp
+        value = order(key)
+        while True:
+            if walk.stamp != stamp:
+                walk.order = order(walk.key)
+                walk.stamp = stamp
+            if walk.data is not None:
+                break
+            if (cmp(value, walk.order) or compare(key, walk.key)) > 0:
+                walk = walk.right
+            else:
+                walk = walk.left
+        return walk, cmp(value, walk.order) or compare(key, walk.key), value
+
+    def _first(self, walk):
+        """Leftmost leaf below walk"""
+        while walk.data is None:
+            walk = walk.left
+        return walk
+
+    def _last(self, walk):
+        """Rightmost leaf below walk"""
+        while walk.data is None:
+            walk = walk.right
+        return walk
+
+    def _next(self, leaf):
+        """Leaf following the given one in key order, or None"""
+        walk = leaf
+        parent = walk.parent
+        while parent is not None and parent.right is walk:
+            walk, parent = parent, parent.parent
+        if parent is None:
+            return None
+        return self._first(parent.right)
+
+    def _previous(self, leaf):
+        """Leaf preceding the given one in key order, or None"""
+        walk = leaf
+        parent = walk.parent
+        while parent is not None and parent.left is walk:
+            walk, parent = parent, parent.parent
+        if parent is None:
+            return None
+        return self._last(parent.left)
+
+    def __contains__(self, key):
+        leaf, case, value = self._locate(key)
+        return leaf is not None and case == 0
+
+    def find(self, key):
+        """Returns an example of an entry with given key.
+
+        raises KeyError if none found.
+        """
+        leaf, case, value = self._locate(key)
+        if leaf is not None and case == 0:
+            return leaf.data[0]
+        raise KeyError('key not found: '+str(key))
+
+    def findAll(self, key):
+        """Returns a list of (key,data) tuples for entries that match the given key."""
+        leaf, case, value = self._locate(key)
+        if leaf is not None and case == 0:
+            return [(leaf.key, d) for d in leaf.data]
+        return []
+
+    def findLow(self, key):
+        """Returns a (key,data) tuple with nearest key less than or equal to given key.
+
+        Returns None when there is no such entry.
+        """
+        leaf, case, value = self._locate(key)
+        if case < 0:
+            leaf = self._previous(leaf)
+        if leaf is None:
+            return None
+        return (leaf.key, leaf.data[0])
+
+    def findHigh(self, key):
+        """Returns a (key,data) tuple with nearest key greater than or equal to given key.
+
+        Returns None when there is no such entry.
+        """
+        leaf, case, value = self._locate(key)
+        if case > 0:
+            leaf = self._next(leaf)
+        if leaf is None:
+            return None
+        return (leaf.key, leaf.data[0])
+
+    def _adjacent(self, key, reverse=False):
+        """The leaf with the nearest key greater than given key (less
+        than it if reverse), or None.
+        """
+        leaf, case, value = self._locate(key)
+        if leaf is None:
+            return None
+        if reverse:
+            return self._previous(leaf) if case <= 0 else leaf
+        return self._next(leaf) if case >= 0 else leaf
+
+    def successor(self, key):
+        """Returns a (key,data) tuple with nearest key strictly greater than given key.
+
+        Returns None when there is no such entry.
+        """
+        leaf = self._adjacent(key)
+        if leaf is None:
+            return None
+        return (leaf.key, leaf.data[0])
+
+    def predecessor(self, key):
+        """Returns a (key,data) tuple with nearest key strictly less than given key.
+
+        Returns None when there is no such entry.
+        """
+        leaf = self._adjacent(key, True)
+        if leaf is None:
+            return None
+        return (leaf.key, leaf.data[0])
+
+    def findMin(self):
+        """Returns (key,data) tuple for the minimum element currently in tree.
+
+        In case of a tie, an arbitrary data element is selected.
+        """
+        if self._root is None:
+            raise RuntimeError('tree is empty')
+        leaf = self._first(self._root)
+        return (leaf.key, leaf.data[-1])
+
+    def findMax(self):
+        """Returns (key,data) tuple for the maximum element currently in tree.
+
+        In case of a tie, an arbitrary data element is selected.
+        """
+        if self._root is None:
+            raise RuntimeError('tree is empty')
+        leaf = self._last(self._root)
+        return (leaf.key, leaf.data[-1])
+
+    def _ranked(self):
+        if not self._ranks:
+            raise RuntimeError('tree does not keep ranks')
+
+    def _before(self, leaf):
+        """Number of entries in the leaves before the given one"""
+        count = 0
+        walk = leaf
+        parent = walk.parent
+        while parent is not None:
+            if parent.right is walk:
+                count += parent.left.size
+            walk, parent = parent, parent.parent
+        return count
+
+    def rank(self, key):
+        """Returns the number of entries with key less than given key.
+
+        Raises RuntimeError unless the tree keeps ranks.
+        """
+        self._ranked()
+        leaf, case, value = self._locate(key)
+        if leaf is None:
+            return 0
+        if case > 0:
+            return self._before(leaf) + leaf.size
+        return self._before(leaf)
+
+    def select(self, k):
+        """Returns the (key,data) tuple of the entry with rank k, counting
+        from 0; negative k count from the end.
+
+        Raises IndexError if out of range, RuntimeError unless the tree
+        keeps ranks.
+        """
+        self._ranked()
+        if k < 0:
+            k += self._size
+        if not 0 <= k < self._size:
+            raise IndexError('rank out of range: '+str(k))
+        walk = self._root
+        while walk.data is None:
+            if k < walk.left.size:
+                walk = walk.left
+            else:
+                k -= walk.left.size
+                walk = walk.right
+        return (walk.key, walk.data[k])
+
+    def count_range(self, lo, hi):
+        """Returns the number of entries with lo <= key <= hi.
+
+        Raises RuntimeError unless the tree keeps ranks.
+        """
+        self._ranked()
+        leaf, case, value = self._locate(hi)
+        if leaf is None:
+            return 0
+        count = self._before(leaf)
+        if case >= 0:
+            count += leaf.size
+        return max(0, count - self.rank(lo))
+
+    def insert(self, key, data=None):
+        """Inserts a new element with given key and data."""
+        self._size += 1
+        end, case, value = self._locate(key)
+        if end is None:
+            if self._order is not None:
+                value = self._order(key)
+            self._root = self._Node(key, [data], None, value, self._stamp)
+            self._root.size = 1
+            return
+        if case == 0:                          # existing key
+            end.data.append(data)
+            if self._ranks:
+                self._resize(end, 1)
+            return
+        # a red internal node takes the place of the leaf, over the old
+        # and new leaves; leaves stay in place for the iterators
+        parent = end.parent
+        newleaf = self._Node(key, [data], None, value, self._stamp)
+        if case < 0:                           # new item is to left
+            node = self._Node(key, None, parent, value, self._stamp)
+            node.left, node.right = newleaf, end
+        else:
+            node = self._Node(end.key, None, parent, end.order, end.stamp)
+            node.left, node.right = end, newleaf
+        if parent is None:
+            self._root = node
+        elif parent.left is end:
+            parent.left = node
+        else:
+            parent.right = node
+        end.parent = newleaf.parent = node
+        node.black = False
+        if self._ranks:
+            newleaf.size = 1
+            node.size = end.size
+            self._resize(node, 1)
+        self._fixupInsert(node)
+
+    def _fixupInsert(self, node):
+        """node is a new red internal node; restores the red-black rules."""
+        parent = node.parent
+        while parent is not None and not parent.black:
+            grandparent = parent.parent     # must exist, since root is never red
+            if grandparent.left is parent:
+                uncle = grandparent.right
+            else:
+                uncle = grandparent.left
+            if not uncle.black:
+                # 5-node must be recolored, continue from grandparent
+                if _DEBUG>1: print "recoloring 5-node"
+                parent.black = uncle.black = True
+                grandparent.black = False
+                node = grandparent
+                parent = node.parent
+                continue
+            # poorly shaped 4-node
+            if (grandparent.left is parent) != (parent.left is node):
+                # crooked alignment requires extra rotation
+                if _DEBUG>1: print "extra rotate"
+                self._rotate(node)
+                node, parent = parent, node
+            if _DEBUG>1: print "rotate"
+            grandparent.black = False
+            parent.black = True
+            self._rotate(parent)
+            break
+        self._root.black = True
 
         if _DEBUG>0 and self._validate() == -1:
             print 'Error after insertion.'
 
+    def _rotate(self, child):
+        """Rotate locally so that child is promoted and its parent is demoted."""
+        parent = child.parent
+        grandparent = parent.parent
+        if grandparent is None:
+            self._root = child   # becoming the root
+        elif grandparent.left is parent:
+            grandparent.left = child
+        else:
+            grandparent.right = child
+        child.parent = grandparent
+        if parent.left is child:
+            moved = parent.left = child.right
+            child.right = parent
+        else:
+            moved = parent.right = child.left
+            child.left = parent
+        moved.parent = parent
+        parent.parent = child
+        if self._ranks:
+            child.size = parent.size
+            parent.size = parent.left.size + parent.right.size
 
-    def _removeLeaf(self, path):
-        """Last node of path is a leaf that should be removed."""
-        problem = len(path) >= 2 and path[-2].isBlack()
-        _BinarySearchTree._contractAbove(self,path)        # path is updated automatically
-        while problem:
-            problem = False  # typically, we fix it. We'll reset to True when necessary
-            if path[-1].isRed():
-                path[-1].setBlack()   # problem solved
-            elif len(path) >= 2:
-                # bottom node is a "double-black" that must be remedied
-                if _DEBUG>1: print "double-black node must be resolved:",path[-1]
-                parent = path[-2]
-                sibling = parent.getOtherChild(path[-1])
-                if len(path) >= 3:
-                    grandparent = path[-3]
-                else:
-                    grandparent = None
-                    
-                if sibling.isRed():
-                    # our parent is a 3-node that we prefer to realign
-                    if _DEBUG>1: print "realigning red sibling"
-                    sibling.setBlack(True)
-                    parent.setBlack(False)
-                    self._rotate(sibling,parent,grandparent)
-                    path.insert(-2,sibling)   # reflects the rotation of sibling above parent
-                    grandparent = sibling
-                    sibling = parent.getOtherChild(path[-1])  # will surely be black this time
-
-                # now sibling is black
-                nephewA,nephewB = _identifyNephews(sibling,parent)   # closer,farther
-                if _DEBUG>1: print "nephews:",nephewA,"-",nephewB
-                if nephewA.isBlack() and nephewB.isBlack():
-                    # we and sibling are 2-nodes.  Recolor sibling to enact merge
-                    if _DEBUG>1: print "sibling also 2-node; recoloring"
-                    sibling.setBlack(False)
-                    if parent.isRed():
-                        parent.setBlack()
-                    else:
-                        if _DEBUG>1: print "will continue with",path[-1]
-                        path.pop()
-                        problem = True   # must continue from parent level
+    def _resize(self, node, delta):
+        """Adds delta entries to the sizes of node and its ancestors"""
+        while node is not None:
+            node.size += delta
+            node = node.parent
+
+    @classmethod
+    def from_sorted(cls, items, cmp=cmp, key=None, ranks=False):
+        """Creates a tree from (key,data) pairs given in key order, in
+        linear time.  Raises ValueError if the keys are not sorted.
+        """
+        tree = cls(cmp, key, ranks=ranks)
+        tree.extend(items)
+        return tree
+
+    def extend(self, items):
+        """Inserts (key,data) pairs given in key order.
+
+        The entries of the tree and the new ones are merged and the tree
+        is rebuilt in O(n+m) time, unless inserting the m items one by
+        one is cheaper.  Raises ValueError if the keys are not sorted.
+        """
+        items = list(items)
+        if not items:
+            return
+        leaves = self._leaves(items)           # checks the order first
+        if len(items) * self._size.bit_length() < self._size:
+            for leaf in leaves:
+                for data in leaf.data:
+                    self.insert(leaf.key, data)
+            return
+        if self._root is not None:
+            leaves = self._merge(leaves)
+        self._build(leaves)
+
+    def _value(self, leaf):
+        """The key function's value for the key of leaf, refreshed if stale"""
+        if leaf.stamp != self._stamp:
+            leaf.order = self._order(leaf.key)
+            leaf.stamp = self._stamp
+        return leaf.order
+
+    def _compareLeaves(self, a, b):
+        if self._order is None:
+            return self._cmp(a.key, b.key)
+        return cmp(self._value(a), self._value(b)) or self._cmp(a.key, b.key)
+
+    def _leaves(self, items):
+        """New leaves for (key,data) pairs in key order, with the data of
+        equal keys consolidated.
+        """
+        Node = self._Node
+        compare = self._cmp
+        order = self._order
+        stamp = self._stamp
+        leaves = []
+        last = None
+        for key, data in items:
+            value = None if order is None else order(key)
+            if last is not None:
+                if order is None:
+                    case = compare(key, last.key)
                 else:
-                    # should be able to maneuver to borrow from sibling
-                    if not nephewA.isRed():
-                        # rotate other nephew and sibling
-                        if _DEBUG>1: print "realigning nephews"
-                        self._rotate(nephewB,sibling,parent)
-                        nephewB.setBlack(True)
-                        sibling.setBlack(False)
-                        sibling = nephewB
-                        nephewA,nephewB = _identifyNephews(sibling,parent)
-                        if _DEBUG>1: print "nephews:",nephewA,"-",nephewB
-
-                    # at this point, nephewA is guaranteed to be red. Let's borrow from it
-                    self._rotate(nephewA,sibling,parent)
-                    self._rotate(nephewA,parent,grandparent)
-                    nephewA.setBlack(parent.isBlack())   # they've been promoted
-                    parent.setBlack()
-                    # cross your fingers; should be done!
+                    case = cmp(value, last.order) or compare(key, last.key)
+                if case == 0:
+                    last.data.append(data)
+                    continue
+                if case < 0:
+                    raise ValueError('keys are not sorted: '+str(key))
+            last = Node(key, [data], None, value, stamp)
+            leaves.append(last)
+        return leaves
+
+    def _merge(self, leaves):
+        """Merges new leaves with those of the tree, in key order"""
+        merged = []
+        old = self._first(self._root)
+        i = 0
+        while old is not None and i < len(leaves):
+            case = self._compareLeaves(leaves[i], old)
+            if case < 0:
+                merged.append(leaves[i])
+                i += 1
+                continue
+            if case == 0:
+                old.data.extend(leaves[i].data)
+                i += 1
+            merged.append(old)
+            old = self._next(old)
+        while old is not None:
+            merged.append(old)
+            old = self._next(old)
+        merged.extend(leaves[i:])
+        return merged
+
+    def _build(self, leaves):
+        """Makes the root a balanced tree over the leaves, bottom up.
+
+        With 2**d <= m < 2**(d+1) leaves, the first m - 2**d pairs of
+        leaves hang from red nodes, and the resulting 2**d subtrees are
+        joined into a perfect tree of black nodes; every path then holds
+        d+1 blacks.
+        """
+        self._size = sum(len(leaf.data) for leaf in leaves)
+        if not leaves:
+            self._root = None
+            return
+        Node = self._Node
+        for leaf in leaves:
+            leaf.left = leaf.right = None
+            leaf.black = True
+            leaf.size = len(leaf.data)
+        nodes, lasts = leaves, leaves       # subtrees and their rightmost leaves
+        red = len(leaves) - (1 << (len(leaves).bit_length() - 1))
+        while len(nodes) > 1:
+            pairs = red or len(nodes) // 2
+            joined = []
+            for i in xrange(0, 2 * pairs, 2):
+                left, right, last = nodes[i], nodes[i+1], lasts[i]
+                node = Node(last.key, None, None, last.order, last.stamp)
+                node.left, node.right = left, right
+                node.size = left.size + right.size
+                node.black = not red
+                left.parent = right.parent = node
+                joined.append(node)
+            nodes = joined + nodes[2*pairs:]
+            lasts = lasts[1:2*pairs:2] + lasts[2*pairs:]
+            red = 0
+        self._root = nodes[0]
+        self._root.parent = None
+
+        if _DEBUG>0 and self._validate() == -1:
+            print 'Error after bulk loading.'
+
+    def _remove(self, leaf, all=False):
+        """Internal version.
+
+        Returns the list of data removed from the leaf (a single element
+        unless 'all' is True), dropping the leaf once it is empty.
+        """
+        matches = leaf.data
+        if not all and len(matches) > 1:
+            results = [matches.pop()]
+            if self._ranks:
+                self._resize(leaf, -1)
+        else:
+            results = matches
+            self._removeLeaf(leaf)
+        self._size -= len(results)
+        return results
+
+    def remove(self, key):
+        """Removes and returns arbitrary data value associated with given key.
+
+        Raises KeyError if not found.
+        """
+        leaf, case, value = self._locate(key)
+        if leaf is None or case != 0:
+            raise KeyError('key not found: '+str(key))
+        return self._remove(leaf)[-1]
+
+    def removeAll(self, key):
+        """Removes and returns list of all data values associated with given key.
+
+        Raises KeyError if not found.
+        """
+        leaf, case, value = self._locate(key)
+        if leaf is None or case != 0:
+            raise KeyError('key not found: '+str(key))
+        return self._remove(leaf, True)
+
+    def removeMin(self):
+        """Removes and returns arbitrary (key,data) pair associated with minimum key.
+
+        Raises RuntimeError if tree empty.
+        """
+        if self._root is None:
+            raise RuntimeError('tree is empty')
+        leaf = self._first(self._root)
+        return (leaf.key, self._remove(leaf)[-1])
+
+    def removeMax(self):
+        """Removes and returns arbitrary (key,data) pair associated with maximum key.
+
+        Raises RuntimeError if tree empty.
+        """
+        if self._root is None:
+            raise RuntimeError('tree is empty')
+        leaf = self._last(self._root)
+        return (leaf.key, self._remove(leaf)[-1])
+
+    def _removeLeaf(self, leaf):
+        """The leaf and its parent disappear, with the sibling taking the
+        place of the parent; then restores the red-black rules.
+        """
+        parent = leaf.parent
+        leaf.parent = None                     # marks the leaf as removed
+        if parent is None:
+            self._root = None
+            return
+        if parent.left is leaf:
+            sibling = parent.right
+        else:
+            sibling = parent.left
+            # the ancestor whose key is that of the leaf gets the key
+            # of the leaf before it, the rightmost one of the sibling
+            walk = parent
+            while walk.parent is not None and walk.parent.right is walk:
+                walk = walk.parent
+            if walk.parent is not None:
+                last = self._last(sibling)
+                walk = walk.parent
+                walk.key, walk.order, walk.stamp = last.key, last.order, last.stamp
+        grandparent = parent.parent
+        sibling.parent = grandparent
+        if grandparent is None:
+            self._root = sibling
+        elif grandparent.left is parent:
+            grandparent.left = sibling
+        else:
+            grandparent.right = sibling
+        if self._ranks:
+            self._resize(grandparent, -leaf.size)
+        if parent.black:
+            self._fixupRemove(sibling)
 
         if _DEBUG>0 and self._validate() == -1:
             print 'Error after deletion.'
 
-    def _validate(self,here=None,prevBlack=True):
+    def _fixupRemove(self, node):
+        """node lost one black from each of its paths; restores the rules."""
+        while node.parent is not None and node.black:
+            # bottom node is a "double-black" that must be remedied
+            if _DEBUG>1: print "double-black node must be resolved:",node
+            parent = node.parent
+            left = parent.left is node
+            sibling = parent.right if left else parent.left
+            if not sibling.black:
+                # our parent is a 3-node that we prefer to realign
+                if _DEBUG>1: print "realigning red sibling"
+                sibling.black = True
+                parent.black = False
+                self._rotate(sibling)
+                sibling = parent.right if left else parent.left   # surely black
+            # now sibling is black (and internal, it holds more blacks)
+            closer, farther = (sibling.left, sibling.right) if left else (sibling.right, sibling.left)
+            if closer.black and farther.black:
+                # we and sibling are 2-nodes.  Recolor sibling to enact merge
+                if _DEBUG>1: print "sibling also 2-node; recoloring"
+                sibling.black = False
+                node = parent   # continues unless the parent was red
+                continue
+            if farther.black:
+                # rotate closer nephew and sibling
+                if _DEBUG>1: print "realigning nephews"
+                closer.black = True
+                sibling.black = False
+                self._rotate(closer)
+                sibling = closer
+                farther = sibling.right if left else sibling.left
+            # borrow from the red farther nephew
+            sibling.black = parent.black
+            parent.black = True
+            farther.black = True
+            self._rotate(sibling)
+            return
+        node.black = True
+
+    def _beyond(self, leaf, bound, value, reverse):
+        """True if the key of leaf is past bound, in the direction of
+        the iteration; value is the key function's value for bound.
+        """
+        if self._order is None:
+            case = self._cmp(bound, leaf.key)
+        else:
+            case = cmp(value, self._value(leaf)) or self._cmp(bound, leaf.key)
+        return case > 0 if reverse else case < 0
+
+    def items(self, lo=None, hi=None, reverse=False):
+        """Generates the (key,data) pairs with lo <= key <= hi in key
+        order, or in reverse order; None leaves that end open.
+
+        Each step walks from the current leaf to the next one, so the
+        iteration takes O(log n + k) time for k entries, and it sees
+        entries inserted or removed meanwhile beyond its position.
+        """
+        if self._root is None:
+            return
+        start, stop = (hi, lo) if reverse else (lo, hi)
+        if start is None:
+            leaf = self._last(self._root) if reverse else self._first(self._root)
+        else:
+            leaf, case, value = self._locate(start)
+            if (case < 0) if reverse else (case > 0):
+                leaf = self._previous(leaf) if reverse else self._next(leaf)
+        value = None
+        if stop is not None and self._order is not None:
+            value = self._order(stop)
+        while leaf is not None:
+            if stop is not None and self._beyond(leaf, stop, value, reverse):
+                return
+            key = leaf.key
+            for d in (reversed(leaf.data) if reverse else leaf.data):
+                yield (key, d)
+                if leaf.parent is None and leaf is not self._root:
+                    break
+            if leaf.parent is None and leaf is not self._root:
+                # removed meanwhile; resume from its key
+                leaf = self._adjacent(key, reverse)
+            else:
+                leaf = self._previous(leaf) if reverse else self._next(leaf)
+
+    def processAll(self, operation, fromNode=None):
+        """Visits all entries in order.
+
+        Operation is assumed to be a callable object that will be sent key and data as two parameters.
+        """
+        if fromNode is None:
+            fromNode = self._root
+        if fromNode is None:
+            return
+        leaf = self._first(fromNode)
+        last = self._last(fromNode)
+        while True:
+            key = leaf.key
+            for d in leaf.data:
+                operation(key, d)
+            if leaf is last:
+                break
+            leaf = self._next(leaf)
+
+    def _dump(self, fromNode=None):
+        """preorder dump"""
+        stack = [fromNode or self._root] if self._root else []
+        while stack:
+            node = stack.pop()
+            print node
+            if node.data is None:
+                stack.append(node.right)
+                stack.append(node.left)
+
+    def _validate(self, here=None, prevBlack=True):
         """Returns the black depth if valid;  -1 if invalid."""
         if here is None:
             here = self._root
         if here is None:
-            answer =  0
-        elif here.isExternal():
-            if here.isRed():
+            answer = 0
+        elif here.data is not None:
+            if not here.black or (self._ranks and here.size != len(here.data)):
                 answer = -1
             else:
-                answer =  1
+                answer = 1
         else:
-            if here.isRed() and not prevBlack:
+            if (not here.black and not prevBlack) or \
+                    here.left.parent is not here or here.right.parent is not here or \
+                    (self._ranks and here.size != here.left.size + here.right.size):
                 answer = -1   # should not have two reds in a row
             else:
-                leftDepth = self._validate(here.getLeft(),here.isBlack())
-                rightDepth = self._validate(here.getRight(),here.isBlack())
+                leftDepth = self._validate(here.left, here.black)
+                rightDepth = self._validate(here.right, here.black)
                 if leftDepth == -1 or rightDepth == -1 or leftDepth != rightDepth:
                     answer = -1
+                elif here.black:
+                    answer = 1 + leftDepth
                 else:
-                    if here.isBlack():
-                        answer = 1 + leftDepth
-                    else:
-                        answer = leftDepth
+                    answer = leftDepth
         return answer
-    
+
 if __name__ == '__main__':
-    from BinarySearchTree import _test
-    _test(RedBlackTree(),10000,_DEBUG)
-    
+    from BinarySearchTree import _test, BinarySearchTree
+    before = _test(BinarySearchTree(), 100000, _DEBUG)
+    after = _test(RedBlackTree(), 100000, _DEBUG)
+    print 'BinarySearchTree %.3f s, RedBlackTree %.3f s: %.1fx faster' % \
+        (before, after, before / after)
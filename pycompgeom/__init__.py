@@ -1,7 +1,10 @@
 from algorithms import *
+from calipers import *
+from intersections import *
 from colors import *
 from events import *
 from generators import *
+from pointsets import *
 from predicates import *
 from primitives import *
 from vinputs import *
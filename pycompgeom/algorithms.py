@@ -1,48 +1,215 @@
 from primitives import *
 from predicates import *
+from pointsets import PointSet2, _shared, _share
+from RedBlackTree import RedBlackTree
+from multiprocessing import Pool, RawArray, cpu_count
+import numpy as np
 import random
 
-def jarvis(points):
+def jarvis(points, prefilter=False):
+	if prefilter:
+		points = akl_toussaint(points)
+	if isinstance(points, PointSet2):
+		return [points[i] for i in _jarvis_indices(points.x, points.y)]
 	r0 = min(points)
 	hull = [r0]
 	r = r0
 	while True:
 		u = random.choice(points)
 		for t in points:
+			if t == r:
+				continue
 			if cw(r, u, t) or collinear(r, u, t) and between(r, t, u):
 				u = t
 		if u == r0: break
 		else:
 			r = u
-			points.remove(r)
 			hull.append(r)
 	return hull
 
 def find_bridge(poly1, poly2, upper=True):
-	max1, min2 = max(poly1.vertices), min(poly2.vertices)
-	i, j = poly1.index(max_p1), poly2.index(min_p2)
+	"""Upper (or lower) common tangent of two ccw convex polygons, poly1
+	lying to the left of poly2.
+	"""
+	vertices1, vertices2 = list(poly1.vertices), list(poly2.vertices)
+	xs = [p.x for p in vertices1 + vertices2]
+	ys = [p.y for p in vertices1 + vertices2]
+	n = len(vertices1)
+	i, j = _bridge(xs, ys, range(n), range(n, len(xs)), upper)
+	return Segment2(vertices1[i], vertices2[j])
+
+def _advances(xs, ys, q, r, p, sign):
+	"""True if a bridge endpoint should move from q to its neighbour r,
+	seen from the other endpoint p; collinear neighbours are taken when
+	they are farther from p, which keeps degenerate hulls from looping.
+	"""
+	o = orient2d_xy(xs[q], ys[q], xs[r], ys[r], xs[p], ys[p])
+	if o:
+		return o == sign
+	return (xs[r]-xs[p])**2 + (ys[r]-ys[p])**2 > (xs[q]-xs[p])**2 + (ys[q]-ys[p])**2
+
+def _bridge(xs, ys, a, b, upper=True):
+	"""Positions in the ccw hulls a and b (index lists into xs, ys, with a
+	lexicographically before b) of the upper or lower bridge endpoints.
+	"""
+	n, m = len(a), len(b)
+	i = max(xrange(n), key=lambda k: (xs[a[k]], ys[a[k]]))
+	j = min(xrange(m), key=lambda k: (xs[b[k]], ys[b[k]]))
+	step, sign = (1, -1) if upper else (-1, 1)
 	
 	bridge_found = False
 	while not bridge_found:
-		if upper:
-			if not ccw(poly1[i], poly1[i+1], poly2[j]):
-				i += 1; i_changed = True
-			else: i_changed = False
-			if not cw(poly2[j], poly2[j-1], poly1[i]):
-				j -= 1; j_changed = True
-			else: j_changed = False
-		else:
-			if not cw(poly1[i], poly1[i-1], poly2[j]):
-				i -= 1; i_changed = True
-			else: i_changed = False
-			if not ccw(poly2[j], poly2[j+1], poly1[i]):
-				j -= 1; j_changed = True
-			else: j_changed = False
-		bridge_found = not i_changed and not j_changed
+		bridge_found = True
+		while _advances(xs, ys, a[i], a[(i+step) % n], b[j], sign):
+			i = (i+step) % n; bridge_found = False
+		while _advances(xs, ys, b[j], b[(j-step) % m], a[i], -sign):
+			j = (j-step) % m; bridge_found = False
+	return i, j
+
+def _merge_hulls(xs, ys, a, b):
+	"""Merges the ccw hulls a and b, a lexicographically before b, through
+	their upper and lower bridges; the result starts at its smallest vertex.
+	"""
+	iu, ju = _bridge(xs, ys, a, b, True)
+	il, jl = _bridge(xs, ys, a, b, False)
+	left = a[iu:il+1] if iu <= il else a[iu:] + a[:il+1]
+	right = b[jl:ju+1] if jl <= ju else b[jl:] + b[:ju+1]
+	hull = left + right
+	k = hull.index(a[0])
+	return hull[k:] + hull[:k]
+
+def _coordinates(points):
+	"""The x and y coordinate arrays of a PointSet2 or a Point2 sequence"""
+	if isinstance(points, PointSet2):
+		return points.x, points.y
+	x = np.fromiter((p.x for p in points), float, len(points))
+	y = np.fromiter((p.y for p in points), float, len(points))
+	return x, y
+
+# [points examined, points removed] by akl_toussaint
+_prefilter_counters = [0, 0]
+
+def prefilter_statistics():
+	"""Returns (points examined, points removed) by akl_toussaint since the last reset"""
+	return tuple(_prefilter_counters)
+
+def reset_prefilter_statistics():
+	_prefilter_counters[0] = _prefilter_counters[1] = 0
+
+def akl_toussaint(points, return_removed=False):
+	"""Akl-Toussaint heuristic: drops the points lying strictly inside the
+	octagon of the extreme points in the x, y, x+y and x-y directions.
 	
-	return Segment2(poly1[i], poly2[j])
+	The hull of what is left is the hull of the input.  A PointSet2 gives
+	a PointSet2, any other sequence a list, both in input order.  With
+	return_removed the number of dropped points is returned as well.
+	"""
+	keep, removed = _akl_toussaint_mask(*_coordinates(points))
+	if isinstance(points, PointSet2):
+		kept = points[keep]
+	else:
+		kept = [points[i] for i in np.flatnonzero(keep).tolist()]
+	if return_removed:
+		return kept, removed
+	return kept
+
+def _akl_toussaint_mask(x, y):
+	"""Mask of the points akl_toussaint keeps, and the number it drops"""
+	n = len(x)
+	inside = np.arange(n)
+	if n:
+		s, d = x + y, x - y
+		corners = [np.argmin(y), np.argmax(d), np.argmax(x), np.argmax(s),
+			np.argmax(y), np.argmin(d), np.argmin(x), np.argmin(s)]
+		ring = []
+		for c in corners:
+			if not ring or (x[c], y[c]) != (x[ring[-1]], y[ring[-1]]):
+				ring.append(c)
+		if (x[ring[0]], y[ring[0]]) == (x[ring[-1]], y[ring[-1]]):
+			ring.pop()
+		if len(ring) < 3:
+			inside = inside[:0]
+		# a point strictly left of every edge is inside the hull of the
+		# corners, whatever rounding did to the choice of corners
+		for k in xrange(len(ring)):
+			p, q = ring[k-1], ring[k]
+			signs = orient2d_batch(x[p], y[p], x[q], y[q], x[inside], y[inside])
+			inside = inside[signs > 0]
+	keep = np.ones(n, bool)
+	keep[inside] = False
+	_prefilter_counters[0] += n
+	_prefilter_counters[1] += len(inside)
+	return keep, len(inside)
+
+def _jarvis_indices(x, y):
+	"""Gift wrapping over coordinate arrays, one vectorized scan per hull vertex"""
+	candidates = np.flatnonzero(x == x.min())
+	r0 = r = candidates[np.argmin(y[candidates])]
+	hull = [r0]
+	while True:
+		others = np.flatnonzero((x != x[r]) | (y != y[r]))
+		if not len(others):
+			return hull
+		u = others[0]
+		while True:
+			signs = orient2d_batch(x[r], y[r], x[u], y[u], x, y)
+			right = np.flatnonzero(signs < 0)
+			if len(right):
+				# move on to the rightmost looking candidate
+				a = area2_batch(x[r], y[r], x[u], y[u], x[right], y[right])
+				u = right[np.argmin(a)]
+				continue
+			# among the points collinear with r and u keep the farthest one
+			collinear = np.flatnonzero(signs == 0)
+			d = (x[collinear]-x[r])**2 + (y[collinear]-y[r])**2
+			u = collinear[np.argmax(d)]
+			break
+		if x[u] == x[r0] and y[u] == y[r0]:
+			return hull
+		r = u
+		hull.append(r)
+
+def _andrew_indices(x, y):
+	"""Monotone chain over coordinate arrays, returns upper and lower index chains"""
+	order = np.lexsort((y, x))
+	upper, lower = _monotone_chains(x[order].tolist(), y[order].tolist())
+	return order[upper].tolist(), order[lower].tolist()
 
-def andrew(points, return_hull=True):
+def _monotone_chains(xs, ys):
+	"""Upper and lower chains of points already sorted by x and then y"""
+	upper = []
+	lower = []
+	for k in xrange(len(xs)):
+		rx, ry = xs[k], ys[k]
+		while len(upper) > 1:
+			p, q = upper[-2], upper[-1]
+			if orient2d_xy(xs[p], ys[p], xs[q], ys[q], rx, ry) < 0:
+				break
+			upper.pop()
+		while len(lower) > 1:
+			p, q = lower[-2], lower[-1]
+			if orient2d_xy(xs[p], ys[p], xs[q], ys[q], rx, ry) > 0:
+				break
+			lower.pop()
+		upper.append(k)
+		lower.append(k)
+	return upper, lower
+
+def andrew(points, return_hull=True, prefilter=False):
+	if prefilter:
+		points = akl_toussaint(points)
+	if isinstance(points, PointSet2):
+		upper, lower = _andrew_indices(points.x, points.y)
+		upper = [points[i] for i in upper]
+		lower = [points[i] for i in lower]
+	else:
+		upper, lower = _andrew_chains(points)
+	if return_hull:
+		return lower[:-1]+ [x for x in reversed(upper[1:])]
+	else:
+		return upper, lower
+
+def _andrew_chains(points):
 	upper = []
 	lower = []
 	for point in sorted(points):
@@ -52,25 +219,421 @@ def andrew(points, return_hull=True):
 			lower.pop()
 		upper.append(point)
 		lower.append(point)
-	if return_hull:
-		return lower[:-1]+ [x for x in reversed(upper[1:])]
+	return upper, lower
+
+def _distinct(points):
+	"""The points without coordinate duplicates, first occurrences kept"""
+	if isinstance(points, PointSet2):
+		# lexsort is stable, so each run of equal points starts with the
+		# first occurrence
+		order = points.lexsort()
+		x, y = points.x[order], points.y[order]
+		first = np.ones(len(order), dtype=bool)
+		first[1:] = (x[1:] != x[:-1]) | (y[1:] != y[:-1])
+		return points[np.sort(order[first])]
+	seen = set()
+	distinct = []
+	for point in points:
+		key = point.x, point.y
+		if key not in seen:
+			seen.add(key)
+			distinct.append(point)
+	return distinct
+
+def _more_clockwise(p, a, b):
+	"""True if, seen from p, a comes before b when sweeping clockwise;
+	collinear points are ordered farthest first.
+	"""
+	o = orient2d_xy(p.x, p.y, a.x, a.y, b.x, b.y)
+	if o:
+		return o > 0
+	return abs(a.x-p.x) + abs(a.y-p.y) > abs(b.x-p.x) + abs(b.y-p.y)
+
+def _tangent(hull, p):
+	"""Index of the vertex of a ccw convex hull that leaves the whole hull
+	to the left of p->vertex, for p outside the hull, in O(log len(hull)).
+	
+	Seen from p the vertices are cyclically unimodal in the clockwise
+	order, so a binary search anchored at vertex 0 finds the minimum.
+	"""
+	n = len(hull)
+	if n < 3:
+		best = 0
+		for i in range(1, n):
+			if _more_clockwise(p, hull[i], hull[best]):
+				best = i
+		return best
+	first = hull[0]
+	down = lambda i: _more_clockwise(p, hull[(i+1) % n], hull[i])
+	rising = not down(0)
+	if rising and down(n-1):
+		return 0
+	a, b = 1, n-1
+	while a < b:
+		c = (a + b) // 2
+		if down(c) != rising:
+			# c lies on the same monotone run as vertex 0 or on the last one
+			if _more_clockwise(p, hull[c], first) == rising:
+				b = c
+			else:
+				a = c + 1
+		elif rising:
+			a = c + 1
+		else:
+			b = c
+	return a
+
+def chan(points, prefilter=False):
+	"""Output sensitive O(n log h) convex hull (Chan's algorithm).
+	
+	Returns the same ccw vertex list as andrew(points), without touching
+	the input.
+	"""
+	if prefilter:
+		points = akl_toussaint(points)
+	points = _distinct(points)
+	n = len(points)
+	if n < 3:
+		return andrew(points)
+	if isinstance(points, PointSet2):
+		# groups are slabs of the sorted coordinates, so each group hull is
+		# a single monotone chain pass over plain floats
+		order = points.lexsort()
+		xs, ys = points.x[order].tolist(), points.y[order].tolist()
+		where = {}
+		def hulls(m):
+			groups = []
+			for k in xrange(0, n, m):
+				upper, lower = _monotone_chains(xs[k:k+m], ys[k:k+m])
+				group = []
+				for i in lower[:-1] + upper[:0:-1] or lower:
+					where[xs[k+i], ys[k+i]] = order[k+i]
+					group.append(Point2(xs[k+i], ys[k+i]))
+				groups.append(group)
+			return groups
+		start = Point2(xs[0], ys[0])
 	else:
-		return upper, lower
+		def hulls(m):
+			return [andrew(points[k:k+m]) or list(points[k:k+m]) for k in xrange(0, n, m)]
+		start = min(points)
+	# the first guesses of the original schedule (4 and 16) almost always
+	# fail on large inputs and cost more than they can save
+	t = 3
+	while True:
+		m = min(2 ** (2 ** t), n)
+		hull = _chan_wrap(hulls(m), start, m)
+		if hull is not None:
+			if isinstance(points, PointSet2):
+				return [points[where[p.x, p.y]] for p in hull]
+			return hull
+		t += 1
 
-def andipodal_pairs(points):
-	U, L = andrew(points, return_hull=False)
-	i, j = 0, len(L)-1
-	while i<len(U)-1 or j>0:
-		yield U[i], L[j]
-		if i == len(U)-1: j -= 1
-		elif j == 0: i += 1
-		elif (U[i+1].y-U[i].y) * (L[j].x-L[j-1].x) > \
-				(L[j].y-L[j-1].y) * (U[i+1].x-U[i].x):
-			i += 1
-		else: j -= 1
+def _chan_wrap(groups, start, m):
+	"""Gift wraps around the ccw hulls of the groups; returns None if the
+	hull turns out to have more than m vertices.
+	"""
+	for g, group in enumerate(groups):
+		for i, vertex in enumerate(group):
+			if vertex == start:
+				break
+		else:
+			continue
+		break
+	p = start
+	hull = [start]
+	for step in xrange(m):
+		group = groups[g]
+		i = (i + 1) % len(group)
+		best, best_g, best_i = group[i], g, i
+		for h, group in enumerate(groups):
+			if h != g:
+				j = _tangent(group, p)
+				if _more_clockwise(p, group[j], best):
+					best, best_g, best_i = group[j], h, j
+		if best == start:
+			return hull
+		p, g, i = best, best_g, best_i
+		hull.append(p)
+	return None
+
+def _chunk_hull(bounds):
+	"""ccw hull of a slice of the shared, sorted coordinates, as indices"""
+	start, stop = bounds
+	upper, lower = _monotone_chains(_shared['x'][start:stop].tolist(),
+		_shared['y'][start:stop].tolist())
+	hull = lower[:-1] + upper[:0:-1] or lower
+	return [start + k for k in hull]
+
+def divide_and_conquer(points, processes=None, chunks=None, prefilter=False):
+	"""Divide and conquer convex hull.
+	
+	The points are sorted, split into chunks of consecutive x, the chunk
+	hulls are built in a pool of processes reading shared coordinate
+	buffers and merged pairwise through their upper and lower bridges.
+	Returns the same ccw vertex list as andrew(points).
+	"""
+	if prefilter:
+		points = akl_toussaint(points)
+	x, y = _coordinates(points)
+	if processes is None:
+		processes = cpu_count()
+	if chunks is None:
+		chunks = processes
+	order = np.lexsort((y, x))
+	xs, ys = x[order], y[order]
+	if len(order):
+		keep = np.ones(len(order), bool)
+		keep[1:] = (xs[1:] != xs[:-1]) | (ys[1:] != ys[:-1])
+		order, xs, ys = order[keep], xs[keep], ys[keep]
+	n = len(order)
+	chunks = max(1, min(chunks, n))
+	bounds = [(n*k//chunks, n*(k+1)//chunks) for k in xrange(chunks)]
+	
+	sx, sy = RawArray('d', n), RawArray('d', n)
+	np.frombuffer(sx)[:] = xs
+	np.frombuffer(sy)[:] = ys
+	if processes > 1 and chunks > 1:
+		pool = Pool(processes, _share, (sx, sy))
+		try:
+			hulls = pool.map(_chunk_hull, bounds)
+		finally:
+			pool.close()
+			pool.join()
+	else:
+		_share(sx, sy)
+		hulls = map(_chunk_hull, bounds)
+		_shared.clear()
+	
+	# merge on local copies of the hull vertices only
+	vertices = np.array([v for hull in hulls for v in hull], int)
+	hxs, hys = xs[vertices].tolist(), ys[vertices].tolist()
+	local = []
+	offset = 0
+	for hull in hulls:
+		local.append(range(offset, offset+len(hull)))
+		offset += len(hull)
+	while len(local) > 1:
+		merged = [_merge_hulls(hxs, hys, local[k], local[k+1])
+			for k in xrange(0, len(local)-1, 2)]
+		if len(local) % 2:
+			merged.append(local[-1])
+		local = merged
+	if not local or not local[0]:
+		return []
+	return [points[i] for i in order[vertices[local[0]]].tolist()]
+
+def _chain_insert(chain, point, sign):
+	"""Adds point to an upper (sign 1) or lower (sign -1) hull chain kept
+	in a RedBlackTree, unless it lies on or behind the chain, and drops the
+	chain vertices it hides.  Returns True if the point was kept.
+	
+	Keys are (x, y, 0), so that (x, y, -1) and (x, y, 1) look up the
+	strict neighbours of a vertex.
+	"""
+	key = (point.x, point.y, 0)
+	if key in chain:
+		return False
+	pred, succ = chain.findLow(key), chain.findHigh(key)
+	if pred and succ and orient2d(pred[1], succ[1], point) * sign <= 0:
+		return False
+	chain.insert(key, point)
+	while pred:
+		before = chain.findLow(pred[0][:2] + (-1,))
+		if before is None or orient2d(before[1], pred[1], point) * sign < 0:
+			break
+		chain.remove(pred[0])
+		pred = before
+	while succ:
+		after = chain.findHigh(succ[0][:2] + (1,))
+		if after is None or orient2d(point, succ[1], after[1]) * sign < 0:
+			break
+		chain.remove(succ[0])
+		succ = after
+	return True
+
+def _chain_points(chain):
+	points = []
+	chain.processAll(lambda key, point: points.append(point))
+	return points
+
+class OnlineHull(object):
+	"""Convex hull of a stream of points.
+	
+	The upper and lower chains of andrew are kept in two RedBlackTrees
+	ordered by (x, y).  Points that fall inside the hull are dropped right
+	away, so memory stays proportional to the hull size and an insertion
+	takes O(log h) amortized time.
+	"""
+	def __init__(self, points=()):
+		self._upper = RedBlackTree()
+		self._lower = RedBlackTree()
+		self.extend(points)
+		
+	def __len__(self):
+		return max(0, len(self._upper) + len(self._lower) - 2)
+		
+	def insert(self, point):
+		"""Adds a point, returns True if it is a vertex of the new hull"""
+		upper = _chain_insert(self._upper, point, 1)
+		lower = _chain_insert(self._lower, point, -1)
+		return upper or lower
+		
+	def extend(self, points):
+		for point in points:
+			self.insert(point)
 			
-def diameter(points):
-	dlist = [((p.x-q.x)**2+(p.y-q.y)**2,(p,q)) \
-		for p,q in antipodal_pairs(points)]  
-	diam, pair = max(dlist)
-	return pair
+	@property
+	def vertices(self):
+		"""The current hull as the ccw vertex list andrew would return"""
+		upper, lower = _chain_points(self._upper), _chain_points(self._lower)
+		return lower[:-1] + upper[:0:-1]
+		
+	@property
+	def hull(self):
+		return Polygon2(self.vertices)
+
+# antipodal_pairs and diameter moved to calipers, which imports this
+# module; these forward to them for existing callers
+
+def antipodal_pairs(points, prefilter=False, is_hull=False):
+	from calipers import antipodal_pairs
+	return antipodal_pairs(points, prefilter, is_hull)
+
+andipodal_pairs = antipodal_pairs
+
+def diameter(points, prefilter=False, is_hull=False):
+	from calipers import diameter
+	return diameter(points, prefilter, is_hull)
+
+### TRIANGULATION ######################################################
+
+def _in_triangle(ax, ay, bx, by, cx, cy, px, py):
+	"""p inside or on the boundary of the ccw triangle abc"""
+	return orient2d_xy(ax, ay, bx, by, px, py) >= 0 and \
+		orient2d_xy(bx, by, cx, cy, px, py) >= 0 and \
+		orient2d_xy(cx, cy, ax, ay, px, py) >= 0
+
+def triangulate(polygon):
+	"""Ear clipping triangulation of a simple polygon.
+
+	Returns ccw triangles as index triples into the vertices of polygon.
+	Only the reflex vertices can make an ear invalid, so they are kept in
+	a uniform grid and each ear is tested against the cells under it;
+	vertices never turn reflex again, so the grid only shrinks.  Linear
+	time for convex polygons, O(n^2) at worst.  Raises ValueError when no
+	ear is left, which only happens for polygons that are not simple.
+	"""
+	vertices = list(polygon.vertices)
+	n = len(vertices)
+	if n < 3:
+		raise ValueError('a polygon needs at least three vertices')
+	xs = [p.x for p in vertices]
+	ys = [p.y for p in vertices]
+	ring = range(n)
+	if polygon.is_clockwise_oriented():
+		ring.reverse()
+	before = dict(zip(ring, ring[-1:] + ring[:-1]))
+	after = dict(zip(ring, ring[1:] + ring[:1]))
+
+	def turn(i):
+		a, c = before[i], after[i]
+		return orient2d_xy(xs[a], ys[a], xs[i], ys[i], xs[c], ys[c])
+
+	minx, miny = min(xs), min(ys)
+	size = max(max(xs) - minx, max(ys) - miny) / (n ** 0.5) or 1.0
+	cell = lambda i: (int((xs[i] - minx) / size), int((ys[i] - miny) / size))
+	grid = {}
+	reflex = set()
+	for i in ring:
+		if turn(i) <= 0:
+			reflex.add(i)
+			grid.setdefault(cell(i), set()).add(i)
+
+	def is_ear(i):
+		if i in reflex:
+			return False
+		a, c = before[i], after[i]
+		ax, ay, bx, by, cx, cy = xs[a], ys[a], xs[i], ys[i], xs[c], ys[c]
+		left, bottom = min(ax, bx, cx), min(ay, by, cy)
+		right, top = max(ax, bx, cx), max(ay, by, cy)
+		for gx in xrange(int((left - minx) / size), int((right - minx) / size) + 1):
+			for gy in xrange(int((bottom - miny) / size), int((top - miny) / size) + 1):
+				for r in grid.get((gx, gy), ()):
+					px, py = xs[r], ys[r]
+					if not (left <= px <= right and bottom <= py <= top) or r in (a, i, c) or \
+							(px, py) in ((ax, ay), (bx, by), (cx, cy)):
+						continue
+					if _in_triangle(ax, ay, bx, by, cx, cy, px, py):
+						return False
+		return True
+
+	triangles = []
+	i, remaining, failures = ring[0], n, 0
+	while remaining > 3:
+		if not is_ear(i):
+			i = after[i]
+			failures += 1
+			if failures > remaining:
+				raise ValueError('polygon is not simple')
+			continue
+		a, c = before[i], after[i]
+		triangles.append((a, i, c))
+		after[a], before[c] = c, a
+		remaining -= 1
+		failures = 0
+		for j in (a, c):
+			if j in reflex and turn(j) > 0:
+				reflex.discard(j)
+				grid[cell(j)].discard(j)
+		i = a
+	triangles.append((before[i], i, after[i]))
+	return triangles
+
+### STREAMING ##########################################################
+# Consumers folding an iterable of point chunks (PointSet2s or Point2
+# sequences) one chunk at a time, so memory depends on the chunk size
+# and the result, not on the number of points.
+
+def streaming_hull(chunks, prefilter=True):
+	"""ccw hull of all the points of the chunks, like andrew: the hull
+	vertices are the Point2 objects of the chunks, except that points of
+	PointSet2 chunks come back as new Point2s, so that the hull does not
+	keep whole chunks alive.  Each chunk is merged with the hull so far,
+	after the Akl-Toussaint prefilter unless prefilter is False.
+	"""
+	hx, hy, vertices = np.empty(0), np.empty(0), []
+	for chunk in chunks:
+		x, y = _coordinates(chunk)
+		x, y = np.concatenate((hx, x)), np.concatenate((hy, y))
+		if prefilter:
+			candidates = np.flatnonzero(_akl_toussaint_mask(x, y)[0])
+		else:
+			candidates = np.arange(len(x))
+		if not len(candidates):
+			continue
+		upper, lower = _andrew_indices(x[candidates], y[candidates])
+		hull = candidates[lower[:-1] + upper[:0:-1] or lower]
+		# indices below h are vertices of the hull so far
+		h, copied = len(vertices), isinstance(chunk, PointSet2)
+		vertices = [vertices[k] if k < h else None if copied else chunk[k - h]
+			for k in hull.tolist()]
+		hx, hy = x[hull], y[hull]
+	return [Point2(x, y) if p is None else p
+		for p, x, y in zip(vertices, hx.tolist(), hy.tolist())]
+
+def streaming_bounding_box(chunks):
+	"""(minx, miny, maxx, maxy) of all the points of the chunks, None if
+	there are none
+	"""
+	box = None
+	for chunk in chunks:
+		x, y = _coordinates(chunk)
+		if not len(x):
+			continue
+		extremes = x.min(), y.min(), x.max(), y.max()
+		if box is None:
+			box = extremes
+		else:
+			box = min(box[0], extremes[0]), min(box[1], extremes[1]), \
+				max(box[2], extremes[2]), max(box[3], extremes[3])
+	return box
@@ -0,0 +1,138 @@
+from primitives import *
+from algorithms import andrew
+from math import sqrt
+
+### ROTATING CALIPERS ##################################################
+# All measures walk the convex hull once, in place.  By default the hull
+# is built with andrew; pass is_hull=True to reuse a hull computed earlier
+# (the ccw vertex list of andrew, or a convex Polygon2).  Fewer than two
+# distinct points raise ValueError.
+
+def _too_few():
+	return ValueError('rotating calipers need at least two distinct points')
+
+def _hull_vertices(points, prefilter, is_hull):
+	if not is_hull:
+		hull = andrew(points, prefilter=prefilter)
+	elif isinstance(points, (list, tuple, Polygon2)):
+		hull = points
+	else:
+		hull = list(points)
+	if not any(hull[k] != hull[0] for k in xrange(1, len(hull))):
+		raise _too_few()
+	return hull
+
+def _chains(points, prefilter, is_hull):
+	"""Upper and lower chains of the hull, both from left to right"""
+	if not is_hull:
+		upper, lower = andrew(points, return_hull=False, prefilter=prefilter)
+		if len(lower) < 2 or lower[0] == lower[-1]:
+			raise _too_few()
+		return upper, lower
+	hull = _hull_vertices(points, prefilter, is_hull)
+	# the chains are new lists, whatever the hull is
+	if isinstance(hull, Polygon2):
+		hull = list(hull.vertices)
+	elif not isinstance(hull, list):
+		hull = list(hull)
+	n = len(hull)
+	first = min(xrange(n), key=lambda k: hull[k])
+	last = max(xrange(n), key=lambda k: hull[k])
+	if first <= last:
+		lower = hull[first:last+1]
+		upper = hull[last:] + hull[:first+1]
+	else:
+		lower = hull[first:] + hull[:last+1]
+		upper = hull[last:first+1]
+	upper.reverse()
+	return upper, lower
+
+def antipodal_pairs(points, prefilter=False, is_hull=False):
+	U, L = _chains(points, prefilter, is_hull)
+	i, j = 0, len(L)-1
+	while i<len(U)-1 or j>0:
+		yield U[i], L[j]
+		if i == len(U)-1: j -= 1
+		elif j == 0: i += 1
+		elif (U[i+1].y-U[i].y) * (L[j].x-L[j-1].x) > \
+				(L[j].y-L[j-1].y) * (U[i+1].x-U[i].x):
+			i += 1
+		else: j -= 1
+
+andipodal_pairs = antipodal_pairs
+
+def diameter(points, prefilter=False, is_hull=False):
+	"""The pair of points farthest apart"""
+	best, pair = -1, None
+	for p, q in antipodal_pairs(points, prefilter, is_hull):
+		d = (p.x-q.x)**2 + (p.y-q.y)**2
+		if d > best:
+			best, pair = d, (p, q)
+	return pair
+
+def _edge_extents(hull):
+	"""For every edge i of a ccw convex polygon yields i, the edge vector
+	(ex, ey), the largest cross product of the edge vector with a vertex
+	and the smallest and largest dot products, all relative to hull[i].
+
+	The three extreme vertices only move forward, so the walk is O(n),
+	with O(1) extra memory.
+	"""
+	n = len(hull)
+	j = None
+	for i in xrange(n):
+		a, b = hull[i], hull[(i+1) % n]
+		ax, ay = a.x, a.y
+		ex, ey = b.x - ax, b.y - ay
+		if not ex and not ey:
+			continue
+		height = lambda k: ex*(hull[k].y-ay) - ey*(hull[k].x-ax)
+		along = lambda k: ex*(hull[k].x-ax) + ey*(hull[k].y-ay)
+		if j is None:
+			j = max(xrange(n), key=height)
+			r = max(xrange(n), key=along)
+			l = min(xrange(n), key=along)
+		else:
+			while height((j+1) % n) > height(j):
+				j = (j+1) % n
+			while along((r+1) % n) > along(r):
+				r = (r+1) % n
+			while along((l+1) % n) < along(l):
+				l = (l+1) % n
+		yield i, ex, ey, height(j), along(l), along(r)
+
+def width(points, prefilter=False, is_hull=False):
+	"""Smallest distance between two parallel lines enclosing the points"""
+	hull = _hull_vertices(points, prefilter, is_hull)
+	return min(h / sqrt(ex*ex + ey*ey)
+		for i, ex, ey, h, lo, hi in _edge_extents(hull))
+
+def _enclosing_rectangle(hull, measure):
+	"""The enclosing rectangle, flush with a hull edge, that minimizes
+	measure(ex, ey, height, length) as a ccw list of four Point2s
+	"""
+	best = None
+	for extents in _edge_extents(hull):
+		i, ex, ey, h, lo, hi = extents
+		value = measure(ex, ey, h, hi - lo)
+		if best is None or value < best[0]:
+			best = value, extents
+	i, ex, ey, h, lo, hi = best[1]
+	ee = float(ex*ex + ey*ey)
+	a = hull[i]
+	nx, ny = -ey * h / ee, ex * h / ee
+	p = Point2(a.x + ex*lo/ee, a.y + ey*lo/ee)
+	q = Point2(a.x + ex*hi/ee, a.y + ey*hi/ee)
+	return [p, q, Point2(q.x+nx, q.y+ny), Point2(p.x+nx, p.y+ny)]
+
+def min_area_rectangle(points, prefilter=False, is_hull=False):
+	"""Smallest area rectangle enclosing the points, as four ccw corners"""
+	hull = _hull_vertices(points, prefilter, is_hull)
+	return _enclosing_rectangle(hull,
+		lambda ex, ey, h, length: h * length / float(ex*ex + ey*ey))
+
+def min_perimeter_rectangle(points, prefilter=False, is_hull=False):
+	"""Smallest perimeter rectangle enclosing the points, as four ccw corners"""
+	hull = _hull_vertices(points, prefilter, is_hull)
+	return _enclosing_rectangle(hull,
+		lambda ex, ey, h, length: (h + length) / sqrt(ex*ex + ey*ey))
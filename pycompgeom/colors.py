@@ -1,10 +1,8 @@
-import pygame
-
-BLACK   = pygame.Color(0, 0, 0)
-WHITE   = pygame.Color(255, 255, 255)
-RED     = pygame.Color(255, 0, 0)
-GREEN   = pygame.Color(0, 255, 0)
-BLUE    = pygame.Color(0, 0, 255)
-YELLOW  = pygame.Color(255, 255, 0)
-MAGENTA = pygame.Color(255, 0, 255)
-CYAN    = pygame.Color(0, 255, 255)
+BLACK   = (0, 0, 0)
+WHITE   = (255, 255, 255)
+RED     = (255, 0, 0)
+GREEN   = (0, 255, 0)
+BLUE    = (0, 0, 255)
+YELLOW  = (255, 255, 0)
+MAGENTA = (255, 0, 255)
+CYAN    = (0, 255, 255)
@@ -2,9 +2,21 @@ LEFTBUTTON = 1
 MIDDLEBUTTON = 2
 RIGHTBUTTON = 3
 
-import pygame
 import sys
 
+class _LazyPygame(object):
+	"""Stands in for the pygame module and imports it the first time one
+	of its attributes is used, so that importing pycompgeom needs neither
+	pygame nor a display.
+	"""
+	def __getattr__(self, name):
+		import pygame as module
+		value = getattr(module, name)
+		setattr(self, name, value)
+		return value
+
+pygame = _LazyPygame()
+
 def should_i_quit(event):
 	if event.type == pygame.QUIT or \
 		event.type == pygame.KEYDOWN \
@@ -1,29 +1,225 @@
+import os
 import random
-from itertools import combinations
+import tempfile
+import numpy as np
+from multiprocessing import Pool, RawArray
 
 from primitives import *
+from pointsets import PointSet2, _shared, _share
 from visuals import *
 from colors import *
 from predicates import *
 from events import *
+from algorithms import triangulate
 
-def random_points_in_window(num, window_size=WINSIZE, offset=20):
+### RANDOM POINTS ######################################################
+# Coordinates are drawn with numpy in blocks of _BLOCK points, each from
+# its own stream spawned from the seed, so the points depend only on the
+# seed and their number, whether they are drawn in one process or many.
+# A seed may be None, an int or a numpy random generator.
+
+_BLOCK = 1 << 20
+
+def _rng_types():
+	if hasattr(np.random, 'Generator'):
+		return np.random.RandomState, np.random.Generator
+	return np.random.RandomState
+
+def _rng(seed):
+	"""A numpy Generator (RandomState on numpy < 1.17) for the seed"""
+	if isinstance(seed, _rng_types()):
+		return seed
+	if hasattr(np.random, 'default_rng'):
+		return np.random.default_rng(seed)
+	return np.random.RandomState(seed)
+
+def _integers(rng, low, high, size):
+	"""Random integers in [low, high)"""
+	if hasattr(rng, 'integers'):
+		return rng.integers(low, high, size)
+	return rng.randint(low, high, size, dtype=np.int64)
+
+def spawn_seeds(seed, count):
+	"""count seeds of independent streams derived from seed, for _rng"""
+	if isinstance(seed, _rng_types()):
+		seed = int(_integers(seed, 0, 2**31, None))
+	if hasattr(np.random, 'SeedSequence'):
+		return np.random.SeedSequence(seed).spawn(count)
+	if seed is None:
+		seed = np.random.randint(2**31)
+	return [[seed, k] for k in xrange(count)]
+
+def _fill_block(task):
+	"""Draws one block of coordinates into the shared buffers"""
+	start, stop, seed, low, high, integer = task
+	x, y = _shared['x'][start:stop], _shared['y'][start:stop]
+	rng = _rng(seed)
+	for out, lo, hi in ((x, low[0], high[0]), (y, low[1], high[1])):
+		if integer:
+			out[:] = _integers(rng, lo, hi, stop - start)
+		else:
+			out[:] = rng.uniform(lo, hi, stop - start)
+
+def _window_range(window_size, offset, integer):
+	"""dtype, RawArray typecode and the low and high coordinates drawn"""
 	maxx, maxy = window_size
-	points = []
-	i=0
-	while i<=num:
-		x = int(random.random()*maxx)
-		y = int(random.random()*maxy)
-		while not (offset < x < maxx - offset):
-			x = int(random.random()*maxx)
-		while not (offset < y < maxy - offset):
-			y = int(random.random()*maxy)
-		points.append(Point2(x,y))
-		i += 1
-	return points
-
-def random_points(num=15, color=RED, visual=False):
-	points = random_points_in_window(num)
+	if integer:
+		return np.int_, 'l', (offset + 1, offset + 1), (maxx - offset, maxy - offset)
+	return np.float64, 'd', (offset, offset), (maxx - offset, maxy - offset)
+
+def random_pointset(num, window_size=WINSIZE, offset=20, seed=None, integer=True, processes=1):
+	"""num random points strictly inside the window, at least offset away
+	from its border, as a PointSet2.  Integer coordinates by default, floats
+	if integer is False.  With processes > 1 the blocks are drawn in a pool
+	of processes writing to shared buffers.
+	"""
+	dtype, typecode, low, high = _window_range(window_size, offset, integer)
+	seeds = spawn_seeds(seed, max(1, -(-num // _BLOCK)))
+	tasks = [(k * _BLOCK, min(num, (k + 1) * _BLOCK), seeds[k], low, high, integer)
+		for k in xrange(len(seeds))]
+	if processes > 1 and len(tasks) > 1:
+		x, y = RawArray(typecode, num), RawArray(typecode, num)
+		pool = Pool(processes, _share, (x, y, dtype))
+		try:
+			pool.map(_fill_block, tasks)
+		finally:
+			pool.close()
+			pool.join()
+		x, y = np.frombuffer(x, dtype), np.frombuffer(y, dtype)
+	else:
+		x, y = np.empty(num, dtype), np.empty(num, dtype)
+		_shared['x'], _shared['y'] = x, y
+		try:
+			for task in tasks:
+				_fill_block(task)
+		finally:
+			_shared.clear()
+	return PointSet2.from_arrays(x, y)
+
+def iter_random_pointsets(num, chunk_size=1 << 16, window_size=WINSIZE, offset=20, seed=None, integer=True):
+	"""The points of random_pointset(num, ...), yielded lazily as PointSet2
+	chunks of at most chunk_size points; only one block is ever in memory.
+	"""
+	dtype, typecode, low, high = _window_range(window_size, offset, integer)
+	blocks = max(1, -(-num // _BLOCK))
+	for k, block_seed in enumerate(spawn_seeds(seed, blocks)):
+		size = min(num, (k + 1) * _BLOCK) - k * _BLOCK
+		x, y = np.empty(size, dtype), np.empty(size, dtype)
+		_shared['x'], _shared['y'] = x, y
+		try:
+			_fill_block((0, size, block_seed, low, high, integer))
+		finally:
+			_shared.clear()
+		for start in xrange(0, size, chunk_size):
+			yield PointSet2.from_arrays(x[start:start+chunk_size], y[start:start+chunk_size])
+
+def iter_random_points(num, chunk_size=1 << 16, window_size=WINSIZE, offset=20, seed=None):
+	"""Like iter_random_pointsets, in lists of Point2"""
+	for chunk in iter_random_pointsets(num, chunk_size, window_size, offset, seed):
+		yield chunk.to_points()
+
+def random_points_in_window(num, window_size=WINSIZE, offset=20, seed=None):
+	return random_pointset(num, window_size, offset, seed).to_points()
+
+### BENCHMARK DISTRIBUTIONS ############################################
+# Named point distributions that expose the worst cases of the algorithms:
+# points on a circle are all hull vertices, grids are full of collinear
+# triples and clusters defeat uniform grid indexes.  Each one maps a numpy
+# generator, a size and the window to two float coordinate arrays.
+
+def _square(rng, num, width, height):
+	return rng.uniform(0, width, num), rng.uniform(0, height, num)
+
+def _disk(rng, num, width, height):
+	radius = min(width, height) / 2.0 * np.sqrt(rng.uniform(0, 1, num))
+	angle = rng.uniform(0, 2 * np.pi, num)
+	return width / 2.0 + radius * np.cos(angle), height / 2.0 + radius * np.sin(angle)
+
+def _circle(rng, num, width, height):
+	radius = min(width, height) / 2.0
+	angle = rng.uniform(0, 2 * np.pi, num)
+	return width / 2.0 + radius * np.cos(angle), height / 2.0 + radius * np.sin(angle)
+
+def _clusters(rng, num, width, height):
+	"""Gaussian clusters around about sqrt(n)/4 random centers"""
+	k = max(1, int(np.sqrt(num)) // 4)
+	cx, cy = rng.uniform(0, width, k), rng.uniform(0, height, k)
+	sigma = min(width, height) / (8.0 * np.sqrt(k))
+	which = _integers(rng, 0, k, num)
+	return cx[which] + rng.normal(0, sigma, num), cy[which] + rng.normal(0, sigma, num)
+
+def _grid(rng, num, width, height):
+	"""num distinct nodes of the smallest square grid holding them, spread
+	over the window; the spacing stays integral so collinear triples are
+	exactly collinear.
+	"""
+	side = int(np.ceil(np.sqrt(num)))
+	step = max(1, int(min(width, height)) // side)
+	nodes = rng.permutation(side * side)[:num]
+	return (nodes % side * step).astype(float), (nodes // side * step).astype(float)
+
+def _kuzmin(rng, num, width, height):
+	"""Kuzmin disk: density proportional to (1 + r^2)^(-3/2), heavy tailed"""
+	u = rng.uniform(0, 1, num)
+	radius = min(width, height) / 40.0 * np.sqrt(1 / (1 - u)**2 - 1)
+	angle = rng.uniform(0, 2 * np.pi, num)
+	return width / 2.0 + radius * np.cos(angle), height / 2.0 + radius * np.sin(angle)
+
+DISTRIBUTIONS = {
+	'square': _square,
+	'disk': _disk,
+	'circle': _circle,
+	'clusters': _clusters,
+	'grid': _grid,
+	'kuzmin': _kuzmin,
+}
+
+def random_distribution(name, num, seed=None, window_size=WINSIZE):
+	"""num points of the named distribution, as a PointSet2"""
+	try:
+		distribution = DISTRIBUTIONS[name]
+	except KeyError:
+		raise ValueError('unknown distribution %r, expected one of %s' %
+			(name, ', '.join(sorted(DISTRIBUTIONS))))
+	width, height = window_size
+	x, y = distribution(_rng(seed), num, width, height)
+	return PointSet2.from_arrays(np.asarray(x, float), np.asarray(y, float))
+
+def benchmark_cache_dir():
+	return os.environ.get('PYCOMPGEOM_CACHE',
+		os.path.join(os.path.expanduser('~'), '.cache', 'pycompgeom'))
+
+def benchmark_points(name, num, seed=0, window_size=WINSIZE, cache_dir=None):
+	"""Like random_distribution, but cached on disk as a (2, n) float64 .npy
+	file keyed by (name, num, seed, window_size), so benchmarks generate
+	every corpus once.  The cached corpus is memory mapped read-only.
+	Seeds other than integers are not cached.
+	"""
+	if not isinstance(seed, (int, long, np.integer)):
+		# fresh or generator seeds name no reproducible corpus
+		return random_distribution(name, num, seed, window_size)
+	if cache_dir is None:
+		cache_dir = benchmark_cache_dir()
+	path = os.path.join(cache_dir, '%s-%d-%d-%dx%d.npy' % ((name, num, seed) + tuple(window_size)))
+	if not os.path.exists(path):
+		pointset = random_distribution(name, num, seed, window_size)
+		if not os.path.isdir(cache_dir):
+			os.makedirs(cache_dir)
+		# write to a private file first so readers never see half a corpus
+		handle, temporary = tempfile.mkstemp(dir=cache_dir, suffix='.npy')
+		try:
+			with os.fdopen(handle, 'wb') as f:
+				np.save(f, np.vstack((pointset.x, pointset.y)))
+			os.rename(temporary, path)
+		except:
+			os.remove(temporary)
+			raise
+		return pointset
+	xy = np.load(path, mmap_mode='r')
+	return PointSet2.from_arrays(xy[0], xy[1])
+
+def random_points(num=15, color=RED, visual=False, seed=None):
+	points = random_points_in_window(num, seed=seed)
 	if visual:
 		vpoints = []
 		for p in points:
@@ -33,32 +229,384 @@ def random_points(num=15, color=RED, visual=False):
 	else:
 		return points
 
-def random_simple_polygon(num=20, color=WHITE, visual=False):
-	pygame.display.set_caption("Generating random simple polygon. Please wait ...")
-	points = random_points_in_window(num)
-	poly = Polygon2(points)
-	done = False
-	while not done:
-		for e, f in combinations(poly.edges,2):
-			if intersects(e, f) and e.end <> f.start:
-				a, b = points.index(e.start), points.index(e.end)
-				c, d = points.index(f.start), points.index(f.end)
-				points[b], points[c] = points[c], points[b]
-				poly = Polygon2(points)
-		done = True
-		for e, f in combinations(poly.edges,2):
-			if intersects(e,f) and e.end <> f.start:
-				done = False
-	# makes polygon counterclockwise	
-	#if poly.is_clockwise_oriented():
-	#	vv = reversed([x for x in poly.vertices])
-	#	poly = Polygon2(vv)
-	#	return poly
+def random_simple_polygon(num=20, color=WHITE, visual=False, seed=None):
+	# float points: integer ones repeat and line up, which the space
+	# partitioning cannot join into a simple polygon
+	return space_partition_polygon(num, seed=seed)
+
+### RANDOM SIMPLE POLYGONS #############################################
+# All generators return a counter-clockwise Polygon2 through the given
+# points, or through num random points of the window drawn with the given
+# seed.  They assume general position: no duplicate and no three
+# collinear points.
+
+def _polygon_points(points, num, rng, window_size=WINSIZE, offset=20):
+	if points is None:
+		maxx, maxy = window_size
+		points = [Point2(rng.uniform(offset, maxx - offset), rng.uniform(offset, maxy - offset))
+			for i in xrange(num)]
+	else:
+		points = list(points)
+	x = np.fromiter((p.x for p in points), float, len(points))
+	y = np.fromiter((p.y for p in points), float, len(points))
+	return points, x, y
+
+def _ccw_polygon(points, order):
+	poly = Polygon2([points[i] for i in order])
 	if poly.is_clockwise_oriented():
 		poly.convert_to_ccw()
-	pygame.display.set_caption('pyCompGeom window')
 	return poly
 
+def star_polygon(num=20, seed=None, points=None):
+	"""Star-shaped polygon: the points in angular order around their
+	centroid, O(n log n).
+	"""
+	points, x, y = _polygon_points(points, num, random.Random(seed))
+	dx, dy = x - x.mean(), y - y.mean()
+	order = np.lexsort((np.hypot(dx, dy), np.arctan2(dy, dx)))
+	return _ccw_polygon(points, order.tolist())
+
+def monotone_polygon(num=20, seed=None, points=None):
+	"""x-monotone polygon: the points below the line through the leftmost
+	and the rightmost point from left to right, then the others back,
+	O(n log n).
+	"""
+	points, x, y = _polygon_points(points, num, random.Random(seed))
+	order = np.lexsort((y, x))
+	first, last = order[0], order[-1]
+	above = orient2d_batch(x[first], y[first], x[last], y[last], x[order], y[order]) > 0
+	return _ccw_polygon(points, order[~above].tolist() + order[above][::-1].tolist())
+
+def _split(coords, ax, ay, bx, by, members, side):
+	"""The members on the given side of the line ab, and the others.  Large
+	sets are split with orient2d_batch on the arrays of coords, small ones
+	one point at a time on its lists.
+	"""
+	x, y, xl, yl = coords
+	if len(members) > 64:
+		members = np.asarray(members)
+		mask = orient2d_batch(ax, ay, bx, by, x[members], y[members]) == side
+		return members[mask].tolist(), members[~mask].tolist()
+	near, far = [], []
+	for i in members:
+		if orient2d_xy(ax, ay, bx, by, xl[i], yl[i]) == side:
+			near.append(i)
+		else:
+			far.append(i)
+	return near, far
+
+def space_partition_polygon(num=20, seed=None, points=None):
+	"""Space partitioning (Auer and Held): a random line through two points
+	splits the rest, and each side is joined into a chain by recursively
+	splitting it again with a random line through one of its points and
+	the segment it must span.  O(n log n) expected.
+	"""
+	rng = random.Random(seed)
+	points, x, y = _polygon_points(points, num, rng)
+	n = len(points)
+	if n < 3:
+		return Polygon2(points)
+	xl, yl = x.tolist(), y.tolist()
+	coords = x, y, xl, yl
+	a, b = rng.sample(xrange(n), 2)
+	rest = [i for i in xrange(n) if i != a and i != b]
+	left, right = _split(coords, xl[a], yl[a], xl[b], yl[b], rest, 1)
+	order = []
+	# chain tasks (p, q, members) and single vertices, last one first
+	stack = [(b, a, left), b, (a, b, right), a]
+	while stack:
+		task = stack.pop()
+		if not isinstance(task, tuple):
+			order.append(task)
+			continue
+		p, q, members = task
+		if not members:
+			continue
+		s = members.pop(rng.randrange(len(members)))
+		t = rng.random()
+		rx, ry = xl[p] + t * (xl[q] - xl[p]), yl[p] + t * (yl[q] - yl[p])
+		side = orient2d_xy(xl[s], yl[s], rx, ry, xl[p], yl[p])
+		near, far = _split(coords, xl[s], yl[s], rx, ry, members, side)
+		stack.append((s, q, far))
+		stack.append(s)
+		stack.append((p, s, near))
+	return _ccw_polygon(points, order)
+
+def _hilbert_order(x, y, bits=16):
+	"""Indices of the points along a Hilbert curve over their bounding box"""
+	n = 1 << bits
+	span = max(x.max() - x.min(), y.max() - y.min()) or 1.0
+	hx = ((x - x.min()) * ((n - 1) / span)).astype(np.int64)
+	hy = ((y - y.min()) * ((n - 1) / span)).astype(np.int64)
+	d = np.zeros(len(x), np.int64)
+	s = n >> 1
+	while s:
+		rx = (hx & s) > 0
+		ry = (hy & s) > 0
+		d += s * s * ((3 * rx) ^ ry)
+		# rotate the quadrant so the curve continues in the next one
+		flip = ~ry & rx
+		hx[flip] = n - 1 - hx[flip]
+		hy[flip] = n - 1 - hy[flip]
+		swap = ~ry
+		hx[swap], hy[swap] = hy[swap], hx[swap].copy()
+		s >>= 1
+	return np.argsort(d, kind='mergesort')
+
+def _crossing_pairs(x, y, u, v, w, z):
+	"""Mask of the pairs of segments u-v and w-z (arrays of point indices)
+	that cross; in general position they cannot merely touch.
+	"""
+	return (orient2d_batch(x[u], y[u], x[v], y[v], x[w], y[w]) *
+		orient2d_batch(x[u], y[u], x[v], y[v], x[z], y[z]) < 0) & \
+		(orient2d_batch(x[w], y[w], x[z], y[z], x[u], y[u]) *
+		orient2d_batch(x[w], y[w], x[z], y[z], x[v], y[v]) < 0)
+
+def _grid_cells(x, y):
+	"""Cell coordinates of the points in a grid of about n square cells
+	over their bounding box, and the number of cells along a side.
+	"""
+	cells = int(np.sqrt(len(x))) + 1
+	span = max(x.max() - x.min(), y.max() - y.min()) or 1.0
+	scale = (cells - 1) / span
+	return ((x - x.min()) * scale).astype(np.int64), \
+		((y - y.min()) * scale).astype(np.int64), cells
+
+def _tour_crossings(x, y, order):
+	"""The crossings of the closed tour, as (u, v, w, z): edge u-v crosses
+	edge w-z.  The edges are bucketed by bounding box in a grid of about n
+	cells, and only edges sharing a cell are tested, all at once with
+	orient2d_batch; O(n) expected for the short edges of these tours.
+	"""
+	n = len(order)
+	heads, tails = np.roll(order, 1), order
+	cx, cy, cells = _grid_cells(x, y)
+	x0, x1 = np.minimum(cx[heads], cx[tails]), np.maximum(cx[heads], cx[tails])
+	y0, y1 = np.minimum(cy[heads], cy[tails]), np.maximum(cy[heads], cy[tails])
+	# one entry per edge and cell of its box
+	width, counts = x1 - x0 + 1, (x1 - x0 + 1) * (y1 - y0 + 1)
+	edge = np.repeat(np.arange(n), counts)
+	step = np.arange(len(edge)) - np.repeat(np.cumsum(counts) - counts, counts)
+	cell = (y0[edge] + step // width[edge]) * cells + x0[edge] + step % width[edge]
+	sort = np.argsort(cell, kind='mergesort')
+	edge, cell = edge[sort], cell[sort]
+	# pair every entry with the later entries of its cell
+	ends = np.searchsorted(cell, cell, 'right')
+	later = ends - np.arange(len(cell)) - 1
+	first = np.repeat(np.arange(len(cell)), later)
+	second = first + 1 + np.arange(len(first)) - np.repeat(np.cumsum(later) - later, later)
+	i, j = edge[first], edge[second]
+	pairs = np.unique(np.minimum(i, j) * n + np.maximum(i, j))
+	i, j = pairs // n, pairs % n
+	# edges next to each other on the tour share a point
+	keep = (j - i > 1) & (j - i < n - 1)
+	i, j = i[keep], j[keep]
+	cross = _crossing_pairs(x, y, heads[i], tails[i], heads[j], tails[j])
+	return zip(heads[i][cross].tolist(), tails[i][cross].tolist(),
+		heads[j][cross].tolist(), tails[j][cross].tolist())
+
+def two_opt_polygon(num=20, seed=None, points=None):
+	"""Untangles the closed tour through the points along a Hilbert curve
+	with 2-opt moves: edges a, b and c, d that cross are replaced by a, c
+	and b, d, reversing the shorter side of the tour in place.  The
+	crossings of the first tour are found with _tour_crossings; the edges
+	are also kept in a grid of about n cells, so each move only tests its
+	two new edges against the edges that share a cell with them.  Every
+	move shortens the tour, so the moves stop once it is simple.
+
+	A Hilbert tour crosses itself O(n) times, mostly between short nearby
+	edges, so this takes about O(n log n) time in practice; but a move
+	reverses up to n/2 vertices, and the number of moves has no
+	polynomial bound in the worst case.
+	"""
+	points, x, y = _polygon_points(points, num, random.Random(seed))
+	n = len(points)
+	order = _hilbert_order(x, y)
+	if n <= 3:
+		return _ccw_polygon(points, order.tolist())
+	position = np.empty(n, np.int64)
+	position[order] = np.arange(n)
+	crossings = _tour_crossings(x, y, order)
+	cx, cy, cells = _grid_cells(x, y)
+	cx, cy, px, py = cx.tolist(), cy.tolist(), x.tolist(), y.tolist()
+	grid = {}
+
+	def box(u, v):
+		for gx in xrange(min(cx[u], cx[v]), max(cx[u], cx[v]) + 1):
+			for gy in xrange(min(cy[u], cy[v]), max(cy[u], cy[v]) + 1):
+				yield gx * cells + gy
+
+	def crosses(u, v, w, z):
+		return orient2d_xy(px[u], py[u], px[v], py[v], px[w], py[w]) * \
+			orient2d_xy(px[u], py[u], px[v], py[v], px[z], py[z]) < 0 and \
+			orient2d_xy(px[w], py[w], px[z], py[z], px[u], py[u]) * \
+			orient2d_xy(px[w], py[w], px[z], py[z], px[v], py[v]) < 0
+
+	for u, v in zip(np.roll(order, 1).tolist(), order.tolist()):
+		for cell in box(u, v):
+			grid.setdefault(cell, set()).add((u, v))
+	while crossings:
+		a, b, c, d = crossings.pop()
+		i, j = _tour_edge(position, a, b, n), _tour_edge(position, c, d, n)
+		if i is None or j is None:
+			continue
+		if i > j:
+			i, j = j, i
+		for k in (i, j):
+			u, v = int(order[k-1]), int(order[k])
+			for cell in box(u, v):
+				grid[cell].discard((u, v))
+				grid[cell].discard((v, u))
+		# reverse the stretch between the two edges, or the rest of the
+		# tour if that is shorter: either leaves the new edges at i and j
+		if 2 * (j - i) <= n:
+			stretch = np.arange(i, j)
+		else:
+			stretch = np.r_[j:n, 0:i]
+		order[stretch] = order[stretch[::-1]]
+		position[order[stretch]] = stretch
+		for k in (i, j):
+			u, v = int(order[k-1]), int(order[k])
+			tested = set()
+			for cell in box(u, v):
+				edges = grid.setdefault(cell, set())
+				for w, z in edges:
+					if (w, z) not in tested and w != u and w != v and z != u and z != v:
+						tested.add((w, z))
+						if crosses(u, v, w, z):
+							crossings.append((u, v, w, z))
+				edges.add((u, v))
+	return _ccw_polygon(points, order.tolist())
+
+def _tour_edge(position, u, v, n):
+	"""The position k of the tour edge joining u and v, order[k-1] to
+	order[k], or None if they are no longer neighbours.
+	"""
+	if (position[v] - position[u]) % n == 1:
+		return position[v]
+	if (position[u] - position[v]) % n == 1:
+		return position[u]
+	return None
+
+### RANDOM CONVEX POLYGONS #############################################
+
+def _valtr_components(rng, values):
+	"""Splits the sorted values between their extremes into two random
+	chains and returns the steps along one chain and back along the other,
+	which sum to zero.
+	"""
+	inner = values[1:-1]
+	first = rng.uniform(0, 1, len(inner)) < 0.5
+	ends = values[:1], values[-1:]
+	there = np.diff(np.concatenate((ends[0], inner[first], ends[1])))
+	back = -np.diff(np.concatenate((ends[0], inner[~first], ends[1])))
+	return np.concatenate((there, back))
+
+def convex_polygon(num=20, seed=None, window_size=WINSIZE, offset=20):
+	"""Uniformly random convex polygon with exactly num vertices (Valtr),
+	O(n log n).  Random x and y coordinates are each split into two chains
+	between their extremes, the chain steps are paired at random into edge
+	vectors, and the edges are laid end to end in angular order.  The
+	polygon fits the box of the coordinates, inside the window.
+
+	The coordinates live on a lattice of step 2^-k, fine enough to look
+	continuous but coarse enough that every vertex is an exact float, so
+	the polygon is strictly convex for the exact predicates even with
+	millions of vertices.
+	"""
+	if num < 3:
+		raise ValueError('a convex polygon needs at least 3 vertices')
+	rng = _rng(seed)
+	maxx, maxy = window_size
+	step = 2.0 ** (int(np.ceil(np.log2(max(maxx, maxy)))) - 40)
+	low, high = int(np.ceil(offset / step)), (int((maxx - offset) / step), int((maxy - offset) / step))
+	while True:
+		x = np.sort(_integers(rng, low, high[0], num))
+		y = np.sort(_integers(rng, low, high[1], num))
+		dx, dy = _valtr_components(rng, x), rng.permutation(_valtr_components(rng, y))
+		order = np.argsort(np.arctan2(dy, dx), kind='mergesort')
+		dx, dy = dx[order], dy[order]
+		while True:
+			vx, vy = np.cumsum(dx).astype(float), np.cumsum(dy).astype(float)
+			turns = orient2d_batch(np.roll(vx, 1), np.roll(vy, 1), vx, vy,
+				np.roll(vx, -1), np.roll(vy, -1))
+			wrong = np.flatnonzero(turns < 0)
+			if not len(wrong):
+				break
+			# arctan2 swapped two nearly parallel edges; put them back
+			k, l = wrong[0], (wrong[0] + 1) % num
+			dx[[k, l]], dy[[k, l]] = dx[[l, k]], dy[[l, k]]
+		# exactly parallel edges would leave a straight vertex: draw again
+		if (turns > 0).all():
+			break
+	vx = (vx - vx.min() + x[0]) * step
+	vy = (vy - vy.min() + y[0]) * step
+	return Polygon2([Point2(px, py) for px, py in zip(vx.tolist(), vy.tolist())])
+
+### POINTS INSIDE POLYGONS #############################################
+
+def _alias_table(weights):
+	"""Vose's alias method: draw k uniformly, keep it with probability[k],
+	otherwise take alias[k]; k is then drawn with the given weights.
+	"""
+	m = len(weights)
+	scaled = (np.asarray(weights, float) * (m / float(np.sum(weights)))).tolist()
+	probability = [1.0] * m
+	alias = range(m)
+	small = [k for k in xrange(m) if scaled[k] < 1.0]
+	large = [k for k in xrange(m) if scaled[k] >= 1.0]
+	while small and large:
+		s, l = small.pop(), large.pop()
+		probability[s], alias[s] = scaled[s], l
+		scaled[l] -= 1.0 - scaled[s]
+		if scaled[l] < 1.0:
+			small.append(l)
+		else:
+			large.append(l)
+	return np.array(probability), np.array(alias)
+
+class PolygonSampler(object):
+	"""Uniform random points inside a simple polygon.
+
+	The polygon is triangulated once and its triangles put in an alias
+	table weighted by area; every batch then picks triangles and points
+	inside them with a few numpy calls, O(1) per point.
+	"""
+
+	def __init__(self, polygon):
+		vertices = list(polygon.vertices)
+		x = np.array([p.x for p in vertices], float)
+		y = np.array([p.y for p in vertices], float)
+		a, b, c = np.array(triangulate(polygon)).T
+		self.ax, self.ay = x[a], y[a]
+		self.ux, self.uy = x[b] - x[a], y[b] - y[a]
+		self.vx, self.vy = x[c] - x[a], y[c] - y[a]
+		areas = (self.ux * self.vy - self.uy * self.vx) / 2.0
+		self.area = areas.sum()
+		self.probability, self.alias = _alias_table(areas)
+
+	def sample(self, num, seed=None):
+		"""num uniform points inside the polygon, as a PointSet2"""
+		rng = _rng(seed)
+		k = _integers(rng, 0, len(self.alias), num)
+		k = np.where(rng.uniform(0, 1, num) < self.probability[k], k, self.alias[k])
+		r, s = rng.uniform(0, 1, num), rng.uniform(0, 1, num)
+		# fold the far half of the parallelogram back into the triangle
+		outside = r + s > 1
+		r[outside], s[outside] = 1 - r[outside], 1 - s[outside]
+		return PointSet2.from_arrays(self.ax[k] + r * self.ux[k] + s * self.vx[k],
+			self.ay[k] + r * self.uy[k] + s * self.vy[k])
+
+	def batches(self, num, batch_size=1 << 20, seed=None):
+		"""Yields num points as PointSet2 batches of at most batch_size,
+		all drawn from one stream
+		"""
+		rng = _rng(seed)
+		for start in xrange(0, num, batch_size):
+			yield self.sample(min(batch_size, num - start), rng)
+
+def random_points_in_polygon(polygon, num, seed=None):
+	return PolygonSampler(polygon).sample(num, seed)
 
 def segments_from_points(points, color=WHITE):
 	n = len(points)
@@ -70,15 +618,38 @@ def segments_from_points(points, color=WHITE):
 		return segments
 	return []
 
-def random_segments(num=15, color=RED, size=WINSIZE, visual=False):
+def iter_segments_from_points(points, chunk_size=1 << 16):
+	"""Segment2s joining consecutive points of any iterable, yielded lazily
+	in lists of at most chunk_size
+	"""
+	chunk = []
+	previous = None
+	for p in points:
+		if previous is not None:
+			chunk.append(Segment2(previous, p))
+			if len(chunk) == chunk_size:
+				yield chunk
+				chunk = []
+		previous = p
+	if chunk:
+		yield chunk
+
+def iter_random_segments(num, chunk_size=1 << 16, window_size=WINSIZE, seed=None):
+	"""num random Segment2s yielded lazily in lists of at most chunk_size"""
+	for chunk in iter_random_pointsets(2 * num, 2 * chunk_size, window_size, seed=seed):
+		points = chunk.to_points()
+		yield [Segment2(p, q) for p, q in zip(points[::2], points[1::2])]
+
+def random_segments(num=15, color=RED, size=WINSIZE, visual=False, seed=None):
 	print "Generating %s random segments ..." % num,
-	p1, p2 = random_points(num), random_points(num)
-	
+	points = random_points_in_window(2 * num, size, seed=seed)
+	p1, p2 = points[::2], points[1::2]
+
 	if visual:
 		segments = [VSegment2(Segment2(x,y), color=color, update_window=False) for x,y in zip(p1,p2)]
 	else:
 		segments = [Segment2(x,y) for x,y in zip(p1,p2)]
-	
+
 	if visual:
 		window.segment_background_is_dirty = True
 	print "Done"
@@ -0,0 +1,390 @@
+import heapq
+from fractions import Fraction
+
+from primitives import *
+from predicates import *
+from predicates import _orient2d_exact
+from RedBlackTree import RedBlackTree
+
+### SEGMENT INTERSECTIONS ##############################################
+# Bentley-Ottmann plane sweep.  A vertical line sweeps the event points
+# (segment endpoints and intersections) from left to right, and bottom
+# to top along a vertical line.  The segments crossing the sweep line are
+# kept in a RedBlackTree in sweep mode, ordered by their height at the
+# current event; segments through the event point are ordered as just
+# before it while they are removed and as just after it otherwise.
+# Intersection points are computed exactly (as Fractions when needed), so
+# the sweep never loses track of segments that meet at a single point.
+
+class _SweepKey(object):
+	"""Key of the status tree: segment i, or a search key (i, side) just
+	below (side -1) or just above (side 1) segment i, or (None, side) for
+	the event point itself.  The tree orders keys by their value, the pair
+	(place, key) with place -1 below the event point, 1 above and 0
+	through it; so this only compares keys on the same side of the point.
+	"""
+	__slots__ = ('status', 'i', 'side')
+
+	def __init__(self, status, key):
+		self.status = status
+		if key.__class__ is tuple:
+			self.i, self.side = key
+		else:
+			self.i, self.side = key, 0
+
+	def __cmp__(self, other):
+		# only the sign of the (int) result matters
+		i, j = self.i, other.i
+		if i == j:
+			return self.side - other.side
+		if i is None:
+			return self.side
+		if j is None:
+			return -other.side
+		status = self.status
+		if status.value(i, None)[0]:
+			c = status.compare_heights(i, j)
+			if c:
+				return c
+		# both pass through the same point of the sweep line
+		c = status.compare_slopes(i, j)
+		if c:
+			return c if status.after else -c
+		return i - j
+
+class _SweepStatus(object):
+	"""Status of the sweep: a RedBlackTree in sweep mode of segment
+	indices, ordered by their place on the sweep line at the current
+	event.  The place of a segment is computed once per event, mostly
+	from its float height; exact arithmetic is only used when the float
+	filter cannot decide.
+	"""
+	def __init__(self, ends):
+		self.ends = ends
+		self.slopes = []
+		for (x1, y1), (x2, y2) in ends:
+			self.slopes.append(float(y2 - y1) / (x2 - x1) if x1 != x2 else None)
+		self.exact_slopes = [None] * len(ends)
+		# float lines through the first endpoints, with their error bounds
+		self.lines = []
+		for ((x1, y1), (x2, y2)), slope in zip(ends, self.slopes):
+			self.lines.append(None if slope is None else (float(x1), float(y1), slope,
+				1e-12 * (abs(y1) + abs(x1) * abs(slope)), 1e-12 * abs(slope)))
+		self.keys = {}
+		self.tree = RedBlackTree(key=self.value, sweep=True)
+		self.after = False
+
+	def move_to(self, point):
+		self.px, self.py = point
+		self.fx, self.fy = float(self.px), float(self.py)
+		self.ferror = 1e-12 * abs(self.fy)
+		self.exact = isinstance(self.px, Fraction) or isinstance(self.py, Fraction)
+		self.signs = {}
+		self.values = {}
+		self.tree.setPosition(point)
+
+	def value(self, key, point):
+		value = self.values.get(key)
+		if value is None:
+			sweepkey = self.keys.get(key)
+			if sweepkey is None:
+				sweepkey = self.keys[key] = _SweepKey(self, key)
+			i = sweepkey.i
+			value = self.values[key] = (0 if i is None else self.place(i), sweepkey)
+		return value
+
+	def place(self, i):
+		"""-1 if segment i passes below the event point, 1 if above, 0 if
+		through it
+		"""
+		line = self.lines[i]
+		if line is not None:
+			x1, y1, slope, error, spread = line
+			d = y1 + (self.fx - x1) * slope - self.fy
+			error += spread * abs(self.fx) + self.ferror
+			if d > error:
+				return 1
+			if -d > error:
+				return -1
+		return -self.above(i)
+
+	def compare_heights(self, a, b):
+		"""Compares the heights of segments a and b at the event"""
+		fx = self.fx
+		xa, ya, sa, ea, da = self.lines[a]
+		xb, yb, sb, eb, db = self.lines[b]
+		d = ya + (fx - xa) * sa - yb - (fx - xb) * sb
+		error = ea + eb + (da + db) * abs(fx)
+		if d > error:
+			return 1
+		if -d > error:
+			return -1
+		return cmp(self.height(a), self.height(b))
+
+	def above(self, i):
+		"""Sign of the height of the event point minus that of segment i"""
+		try:
+			return self.signs[i]
+		except KeyError:
+			sign = self.signs[i] = self._above(i)
+			return sign
+
+	def _above(self, i):
+		(x1, y1), (x2, y2) = self.ends[i]
+		if x1 == x2 or (x1, y1) == (self.px, self.py) or (x2, y2) == (self.px, self.py):
+			return 0
+		if not self.exact:
+			return orient2d_xy(x1, y1, x2, y2, self.px, self.py)
+		# an intersection point, rounded to floats for the filter
+		fx, fy = self.fx, self.fy
+		detleft = (x1 - fx) * (y2 - fy)
+		detright = (y1 - fy) * (x2 - fx)
+		det = detleft - detright
+		error = 1e-12 * (abs(detleft) + abs(detright) + (abs(fx) + abs(fy)) *
+			(abs(x1 - fx) + abs(y1 - fy) + abs(x2 - fx) + abs(y2 - fy)))
+		if det > error:
+			return 1
+		if -det > error:
+			return -1
+		return _orient2d_exact(x1, y1, x2, y2, self.px, self.py)
+
+	def height(self, i):
+		"""Exact height of segment i at the event"""
+		(x1, y1), (x2, y2) = self.ends[i]
+		if x1 == x2:
+			return self.py
+		return Fraction(y1) + (Fraction(self.px) - Fraction(x1)) * \
+			(Fraction(y2) - Fraction(y1)) / (Fraction(x2) - Fraction(x1))
+
+	def compare_slopes(self, a, b):
+		sa, sb = self.slopes[a], self.slopes[b]
+		if sa is None or sb is None:
+			return cmp(sa is None, sb is None)
+		if abs(sa - sb) > 1e-12 * (abs(sa) + abs(sb)):
+			return cmp(sa, sb)
+		return cmp(self.exact_slope(a), self.exact_slope(b))
+
+	def exact_slope(self, i):
+		slope = self.exact_slopes[i]
+		if slope is None:
+			(x1, y1), (x2, y2) = self.ends[i]
+			slope = self.exact_slopes[i] = \
+				(Fraction(y2) - Fraction(y1)) / (Fraction(x2) - Fraction(x1))
+		return slope
+
+	def scan(self):
+		"""The segments through the event point, from bottom to top, and
+		the closest segments below and above it (None if there are none).
+		The segments through the point are contiguous in the tree.
+		"""
+		below = self.tree.findLow((None, -1))
+		through, above = [], None
+		for i, segment in self.tree.items((None, -1)):
+			if self.above(i):
+				above = i
+				break
+			through.append(i)
+		return through, below and below[0], above
+
+	def extremes(self, inserted):
+		"""The lowest and the highest of segments through the event point"""
+		keys = [self.value(i, None) for i in inserted]
+		return min(keys)[1].i, max(keys)[1].i
+
+def _crossing(ends, a, b):
+	"""The single point shared by segments a and b, None if they are
+	disjoint or overlap.
+	"""
+	(ax1, ay1), (ax2, ay2) = ends[a]
+	(bx1, by1), (bx2, by2) = ends[b]
+	o1 = orient2d_xy(ax1, ay1, ax2, ay2, bx1, by1)
+	o2 = orient2d_xy(ax1, ay1, ax2, ay2, bx2, by2)
+	if o1 * o2 > 0 or o1 == o2 == 0:
+		return None
+	o3 = orient2d_xy(bx1, by1, bx2, by2, ax1, ay1)
+	o4 = orient2d_xy(bx1, by1, bx2, by2, ax2, ay2)
+	if o3 * o4 > 0:
+		return None
+	if o1 == 0:
+		return ends[b][0]
+	if o2 == 0:
+		return ends[b][1]
+	if o3 == 0:
+		return ends[a][0]
+	if o4 == 0:
+		return ends[a][1]
+	ax1, ay1, ax2, ay2, bx1, by1, bx2, by2 = map(Fraction,
+		(ax1, ay1, ax2, ay2, bx1, by1, bx2, by2))
+	dax, day, dbx, dby = ax2 - ax1, ay2 - ay1, bx2 - bx1, by2 - by1
+	t = ((bx1 - ax1) * dby - (by1 - ay1) * dbx) / (dax * dby - day * dbx)
+	return ax1 + t * dax, ay1 + t * day
+
+def _meet(ends, a, b):
+	"""True if segments a and b share at least one point"""
+	(ax1, ay1), (ax2, ay2) = ends[a]
+	(bx1, by1), (bx2, by2) = ends[b]
+	o1 = orient2d_xy(ax1, ay1, ax2, ay2, bx1, by1)
+	o2 = orient2d_xy(ax1, ay1, ax2, ay2, bx2, by2)
+	if o1 * o2 > 0:
+		return False
+	o3 = orient2d_xy(bx1, by1, bx2, by2, ax1, ay1)
+	o4 = orient2d_xy(bx1, by1, bx2, by2, ax2, ay2)
+	if o1 == o2 == o3 == o4 == 0:
+		# collinear, or a single point on the line of the other segment
+		return max(ends[a][0], ends[b][0]) <= min(ends[a][1], ends[b][1])
+	return o3 * o4 <= 0
+
+def _plain(value):
+	return float(value) if isinstance(value, Fraction) else value
+
+def segment_intersections(segments):
+	"""Bentley-Ottmann sweep in O((n+k) log n) time.
+
+	Returns a list of (Point2, [segments]) with every point where two or
+	more segments meet, in sweep order, together with the segments that
+	contain it.  Overlapping segments are reported at the endpoints they
+	share.
+	"""
+	ends = []
+	starts, stops = {}, {}
+	for i, s in enumerate(segments):
+		p, q = sorted([(s.start.x, s.start.y), (s.end.x, s.end.y)])
+		ends.append((p, q))
+		starts.setdefault(p, []).append(i)
+		stops.setdefault(q, []).append(i)
+	# events are (x, x, y, y, a, b) for endpoints, with a = b = None, and
+	# for the crossings of segments a and b; an exact coordinate follows
+	# its float approximation, which decides most comparisons cheaply
+	queue = [(float(x), x, float(y), y, None, None)
+		for x, y in set(starts) | set(stops)]
+	heapq.heapify(queue)
+	tested = set()
+	status = _SweepStatus(ends)
+	tree = status.tree
+	result = []
+
+	def schedule(a, b, event):
+		# two segments meet at most once unless they overlap, and the
+		# endpoints of an overlap are events already, so each pair is
+		# tested only the first time it becomes adjacent
+		if a is None or b is None:
+			return
+		pair = min(a, b), max(a, b)
+		if pair in tested:
+			return
+		tested.add(pair)
+		q = _crossing(ends, a, b)
+		if q is not None:
+			x, y = q
+			q = (float(x), x, float(y), y) + pair
+			if q[:4] > event[:4]:
+				heapq.heappush(queue, q)
+
+	while queue:
+		event = heapq.heappop(queue)
+		fx, x, fy, y, a, b = event
+		point = x, y
+		crossed = []
+		if a is not None:
+			crossed.extend((a, b))
+		# equal points come out together, endpoints first
+		while queue and queue[0][0] == fx and queue[0][2] == fy and \
+				queue[0][1] == x and queue[0][3] == y:
+			crossed.extend(heapq.heappop(queue)[4:])
+		status.move_to(point)
+		for i in crossed:
+			status.signs[i] = 0
+		status.after = False
+		through, below, above = status.scan()
+		started = starts.get(point, ()) if a is None else ()
+		upper = [i for i in started if ends[i][0] != ends[i][1]]
+		met = set(through) | set(started)
+		if len(met) > 1:
+			x, y = point
+			result.append((Point2(_plain(x), _plain(y)),
+				[segments[i] for i in sorted(met)]))
+
+		for i in through:
+			tree.remove(i)
+		status.after = True
+		inserted = [i for i in through if ends[i][1] != point] + upper
+		for i in inserted:
+			tree.insert(i, segments[i])
+		if not inserted:
+			schedule(below, above, event)
+		else:
+			first, last = status.extremes(inserted)
+			schedule(below, first, event)
+			schedule(last, above, event)
+	return result
+
+def intersecting_pairs(segments):
+	"""All pairs of segments that share at least one point, each pair once"""
+	index = dict((id(s), i) for i, s in enumerate(segments))
+	seen = set()
+	pairs = []
+	for point, met in segment_intersections(segments):
+		for k in xrange(len(met)):
+			for l in xrange(k+1, len(met)):
+				key = index[id(met[k])], index[id(met[l])]
+				if key not in seen:
+					seen.add(key)
+					pairs.append((met[k], met[l]))
+	return pairs
+
+def shamos_hoey(segments, ignore=None):
+	"""Shamos-Hoey sweep in O(n log n) time: the indices (i, j), i < j, of
+	a pair of segments that share a point, or None if there is none.
+
+	ignore(i, j) may excuse the contact of two segments; excused contacts
+	must happen at endpoints the two segments share.  The sweep stops at
+	the first pair that is not excused.
+	"""
+	ends = []
+	starts, stops = {}, {}
+	for i, s in enumerate(segments):
+		p, q = sorted([(s.start.x, s.start.y), (s.end.x, s.end.y)])
+		ends.append((p, q))
+		starts.setdefault(p, []).append(i)
+		stops.setdefault(q, []).append(i)
+	status = _SweepStatus(ends)
+	tree = status.tree
+
+	def offending(a, b):
+		if a is None or b is None:
+			return None
+		pair = min(a, b), max(a, b)
+		if ignore is not None and ignore(*pair):
+			return None
+		if _meet(ends, a, b):
+			return pair
+		return None
+
+	for point in sorted(set(starts) | set(stops)):
+		status.move_to(point)
+		status.after = False
+		through, below, above = status.scan()
+		met = through + [i for i in starts.get(point, ()) if i not in through]
+		for k in xrange(len(met)):
+			for l in xrange(k+1, len(met)):
+				pair = offending(met[k], met[l])
+				if pair:
+					return pair
+
+		for i in through:
+			tree.remove(i)
+		status.after = True
+		inserted = [i for i in through if ends[i][1] != point] + \
+			[i for i in starts.get(point, ()) if ends[i][0] != ends[i][1]]
+		for i in inserted:
+			tree.insert(i, segments[i])
+		if not inserted:
+			tested = [(below, above)]
+		else:
+			first, last = status.extremes(inserted)
+			tested = [(below, first), (last, above)]
+		for a, b in tested:
+			pair = offending(a, b)
+			if pair:
+				return pair
+	return None
@@ -0,0 +1,126 @@
+import numpy as np
+
+from primitives import Point2
+
+class PointView2(Point2):
+	"""A Point2 whose coordinates live inside a PointSet2.
+
+	Reading or writing x and y goes straight to the arrays of the
+	pointset, so handing out views never copies coordinates.
+	"""
+	__slots__ = ('_pointset', '_index')
+
+	def __init__(self, pointset, index):
+		self._pointset = pointset
+		self._index = index
+
+	@classmethod
+	def from_point2(cls, point2):
+		return Point2(point2.x, point2.y)
+
+	@classmethod
+	def from_tuple(cls, tup):
+		return Point2(tup[0], tup[1])
+
+	@property
+	def index(self):
+		return self._index
+
+	@property
+	def x(self):
+		return self._pointset.x[self._index]
+	@x.setter
+	def x(self, value):
+		self._pointset.x[self._index] = value
+
+	@property
+	def y(self):
+		return self._pointset.y[self._index]
+	@y.setter
+	def y(self, value):
+		self._pointset.y[self._index] = value
+
+	def __repr__(self):
+		return "PointView2(%s,%s)" % (self.x, self.y)
+
+class PointSet2(object):
+	"""A set of 2d points stored as two contiguous coordinate arrays.
+
+	Indexing with an integer returns a PointView2, slicing returns a
+	PointSet2 sharing the same memory.
+	"""
+
+	def __init__(self, x=(), y=(), dtype=float, copy=True):
+		self.x = np.array(x, dtype=dtype, copy=copy)
+		self.y = np.array(y, dtype=dtype, copy=copy)
+		if self.x.ndim != 1 or self.x.shape != self.y.shape:
+			raise ValueError('x and y must be 1d arrays of equal length')
+
+	@classmethod
+	def from_points(cls, points, dtype=float):
+		"""Builds a PointSet2 out of any sequence of Point2-like objects"""
+		n = len(points)
+		x = np.fromiter((p.x for p in points), dtype, n)
+		y = np.fromiter((p.y for p in points), dtype, n)
+		return cls(x, y, copy=False)
+
+	@classmethod
+	def from_arrays(cls, x, y):
+		"""Wraps two existing coordinate arrays without copying them"""
+		return cls(x, y, dtype=None, copy=False)
+
+	@classmethod
+	def from_array(cls, xy):
+		"""Wraps the columns of an (n, 2) array without copying them"""
+		xy = np.asarray(xy)
+		return cls(xy[:,0], xy[:,1], dtype=None, copy=False)
+
+	def to_points(self):
+		"""Returns a list of independent Point2 objects"""
+		return [Point2(x, y) for x, y in zip(self.x.tolist(), self.y.tolist())]
+
+	@property
+	def coordinates(self):
+		return np.column_stack((self.x, self.y))
+
+	def __len__(self):
+		return len(self.x)
+
+	def __getitem__(self, index):
+		if isinstance(index, (int, long, np.integer)):
+			n = len(self.x)
+			if index < 0:
+				index += n
+			if not 0 <= index < n:
+				raise IndexError('PointSet2 index out of range')
+			return PointView2(self, index)
+		return PointSet2(self.x[index], self.y[index], dtype=None, copy=False)
+
+	def __setitem__(self, index, point):
+		self.x[index], self.y[index] = point.x, point.y
+
+	def __iter__(self):
+		for i in xrange(len(self.x)):
+			yield PointView2(self, i)
+
+	def __repr__(self):
+		return "PointSet2(%d points)" % len(self.x)
+
+	def lexsort(self):
+		"""Returns the indices that sort the points by x and then by y"""
+		return np.lexsort((self.y, self.x))
+
+	def argmin(self):
+		"""Returns the index of the lexicographically smallest point"""
+		candidates = np.flatnonzero(self.x == self.x.min())
+		return candidates[np.argmin(self.y[candidates])]
+
+# coordinate buffers shared with the workers of a process pool
+_shared = {}
+
+def _share(x, y, dtype=np.float64):
+	"""Pool initializer: views the RawArrays x and y as the arrays
+	_shared['x'] and _shared['y'] of the process
+	"""
+	_shared['x'] = np.frombuffer(x, dtype)
+	_shared['y'] = np.frombuffer(y, dtype)
@@ -1,20 +1,174 @@
+import numpy as np
+from fractions import Fraction
+
+### ROBUST PREDICATES ##################################################
+# orient2d, orient3d and incircle first evaluate their determinant in
+# floating point together with a bound on its rounding error (Shewchuk's
+# "A" bounds).  Only when the sign is not certain is the determinant
+# recomputed exactly with rationals.  Integer and Fraction coordinates
+# are exact already and never take the slow path.
+
+_epsilon = 2.0 ** -53
+_ccwerrboundA = (3.0 + 16.0 * _epsilon) * _epsilon
+_o3derrboundA = (7.0 + 56.0 * _epsilon) * _epsilon
+_iccerrboundA = (10.0 + 96.0 * _epsilon) * _epsilon
+
+# predicate name -> [evaluations, exact fallbacks]
+_counters = {'orient2d': [0, 0], 'orient3d': [0, 0], 'incircle': [0, 0]}
+
+def robust_statistics():
+	"""Returns {predicate: (evaluations, exact fallbacks)} since the last reset"""
+	return dict((name, tuple(counts)) for name, counts in _counters.items())
+
+def reset_robust_statistics():
+	for counts in _counters.values():
+		counts[0] = counts[1] = 0
+
+def _sign(value):
+	if value > 0:
+		return 1
+	return -1 if value < 0 else 0
+
+def _widen(value):
+	"""A numpy scalar as the Python float or int of the same value"""
+	if isinstance(value, np.floating):
+		return float(value)
+	if isinstance(value, np.integer):
+		return int(value)
+	return value
+
+def orient2d_xy(px, py, qx, qy, rx, ry):
+	"""Exact sign of area2 for the points (px,py), (qx,qy), (rx,ry)"""
+	detleft = (px - rx) * (qy - ry)
+	detright = (py - ry) * (qx - rx)
+	det = detleft - detright
+	if det.__class__ is not float:
+		if isinstance(det, np.generic):
+			# numpy float32 rounds beyond the error bound and int64 can
+			# wrap around; Python floats hold float16/32 values exactly
+			# and Python ints do not overflow
+			return orient2d_xy(*map(_widen, (px, py, qx, qy, rx, ry)))
+		# ints and Fractions are exact
+		_counters['orient2d'][0] += 1
+		return _sign(det)
+	counts = _counters['orient2d']
+	counts[0] += 1
+	errbound = _ccwerrboundA * (abs(detleft) + abs(detright))
+	if det > errbound:
+		return 1
+	if -det > errbound:
+		return _sign(det)
+	if det == 0 and errbound == 0:
+		return 0
+	counts[1] += 1
+	return _orient2d_exact(px, py, qx, qy, rx, ry)
+
+def _fraction(value):
+	return Fraction(_widen(value))
+
+def _orient2d_exact(px, py, qx, qy, rx, ry):
+	px, py, qx, qy, rx, ry = map(_fraction, (px, py, qx, qy, rx, ry))
+	return _sign((px - rx) * (qy - ry) - (py - ry) * (qx - rx))
+
+def orient2d(p, q, r):
+	"""1 if p, q, r make a left turn, -1 for a right turn, 0 if collinear"""
+	return orient2d_xy(p.x, p.y, q.x, q.y, r.x, r.y)
+
+def orient3d(a, b, c, d):
+	"""1 if d lies below the plane through a, b, c (ccw seen from above),
+	-1 if above and 0 if the four points are coplanar.
+	"""
+	counts = _counters['orient3d']
+	counts[0] += 1
+	adx, ady, adz = a.x - d.x, a.y - d.y, a.z - d.z
+	bdx, bdy, bdz = b.x - d.x, b.y - d.y, b.z - d.z
+	cdx, cdy, cdz = c.x - d.x, c.y - d.y, c.z - d.z
+	bdxcdy, cdxbdy = bdx * cdy, cdx * bdy
+	cdxady, adxcdy = cdx * ady, adx * cdy
+	adxbdy, bdxady = adx * bdy, bdx * ady
+	det = adz * (bdxcdy - cdxbdy) + bdz * (cdxady - adxcdy) + cdz * (adxbdy - bdxady)
+	permanent = (abs(bdxcdy) + abs(cdxbdy)) * abs(adz) + \
+		(abs(cdxady) + abs(adxcdy)) * abs(bdz) + \
+		(abs(adxbdy) + abs(bdxady)) * abs(cdz)
+	errbound = _o3derrboundA * permanent
+	if det.__class__ is float:
+		if det > errbound:
+			return 1
+		if -det > errbound:
+			return -1
+		if det == 0 and errbound == 0:
+			return 0
+	elif not isinstance(det, np.generic):
+		# ints and Fractions are exact
+		return _sign(det)
+	# uncertain, or numpy scalars that may have rounded or overflowed
+	counts[1] += 1
+	F = _fraction
+	adx, ady, adz = F(a.x) - F(d.x), F(a.y) - F(d.y), F(a.z) - F(d.z)
+	bdx, bdy, bdz = F(b.x) - F(d.x), F(b.y) - F(d.y), F(b.z) - F(d.z)
+	cdx, cdy, cdz = F(c.x) - F(d.x), F(c.y) - F(d.y), F(c.z) - F(d.z)
+	return _sign(adz * (bdx * cdy - cdx * bdy) + bdz * (cdx * ady - adx * cdy) + \
+		cdz * (adx * bdy - bdx * ady))
+
+def incircle(a, b, c, d):
+	"""1 if d lies inside the circle through the ccw points a, b, c,
+	-1 if outside and 0 if the four points are cocircular.
+	"""
+	counts = _counters['incircle']
+	counts[0] += 1
+	adx, ady = a.x - d.x, a.y - d.y
+	bdx, bdy = b.x - d.x, b.y - d.y
+	cdx, cdy = c.x - d.x, c.y - d.y
+	bdxcdy, cdxbdy = bdx * cdy, cdx * bdy
+	cdxady, adxcdy = cdx * ady, adx * cdy
+	adxbdy, bdxady = adx * bdy, bdx * ady
+	alift = adx * adx + ady * ady
+	blift = bdx * bdx + bdy * bdy
+	clift = cdx * cdx + cdy * cdy
+	det = alift * (bdxcdy - cdxbdy) + blift * (cdxady - adxcdy) + clift * (adxbdy - bdxady)
+	permanent = (abs(bdxcdy) + abs(cdxbdy)) * alift + \
+		(abs(cdxady) + abs(adxcdy)) * blift + \
+		(abs(adxbdy) + abs(bdxady)) * clift
+	errbound = _iccerrboundA * permanent
+	if det.__class__ is float:
+		if det > errbound:
+			return 1
+		if -det > errbound:
+			return -1
+		if det == 0 and errbound == 0:
+			return 0
+	elif not isinstance(det, np.generic):
+		# ints and Fractions are exact
+		return _sign(det)
+	# uncertain, or numpy scalars that may have rounded or overflowed
+	counts[1] += 1
+	F = _fraction
+	adx, ady = F(a.x) - F(d.x), F(a.y) - F(d.y)
+	bdx, bdy = F(b.x) - F(d.x), F(b.y) - F(d.y)
+	cdx, cdy = F(c.x) - F(d.x), F(c.y) - F(d.y)
+	return _sign((adx * adx + ady * ady) * (bdx * cdy - cdx * bdy) + \
+		(bdx * bdx + bdy * bdy) * (cdx * ady - adx * cdy) + \
+		(cdx * cdx + cdy * cdy) * (adx * bdy - bdx * ady))
+
+### PREDICATES #########################################################
+
 def area2(p, q, r):
 	return (r.y-p.y) * (q.x-p.x) - (q.y-p.y) * (r.x-p.x)
 
 def ccw(p, q, r):
-	return area2(p, q, r) > 0
+	return orient2d(p, q, r) > 0
 	
 def ccwon(p, q, r):
-	return area2(p, q, r) >= 0
+	return orient2d(p, q, r) >= 0
 	
 def cw(p, q, r):
-	return area2(p, q, r) < 0
+	return orient2d(p, q, r) < 0
 	
 def cwon(p, q, r):
-	return area2(p, q, r) <= 0
+	return orient2d(p, q, r) <= 0
 	
 def collinear(p, q, r):
-	return area2(p, q, r) == 0
+	return orient2d(p, q, r) == 0
 	
 def between(p, q, r):
 	if not collinear(p, q, r):
@@ -44,3 +198,86 @@ def orientation(a, b, c, d):
 	else:
 		return 'collinear'
 		
+
+### BATCH KERNELS ######################################################
+# The *_batch predicates take coordinate arrays instead of points and
+# evaluate all triples in a single NumPy pass.  Arguments broadcast, so
+# passing scalars for p and q tests a whole cloud against one line pq.
+
+def area2_batch(px, py, qx, qy, rx, ry):
+	px, py, qx, qy, rx, ry = map(np.asarray, (px, py, qx, qy, rx, ry))
+	return (ry-py) * (qx-px) - (qy-py) * (rx-px)
+
+def _batch_arrays(arrays):
+	"""The arrays broadcast together, in a type the filter can trust:
+	float64 for floats (float16 and float32 convert exactly), int64 for
+	integers small enough that the determinant cannot overflow, and
+	Python ints for larger ones.
+	"""
+	arrays = np.broadcast_arrays(*map(np.asarray, arrays))
+	kinds = set(a.dtype.kind for a in arrays)
+	if 'O' in kinds:
+		return arrays
+	if 'f' in kinds:
+		return [a.astype(np.float64) for a in arrays]
+	# |coordinates| < 2^30 keep the cross products within int64
+	if all(not a.size or (a.min() > -2**30 and a.max() < 2**30) for a in arrays):
+		return [a.astype(np.int64) for a in arrays]
+	return [a.astype(object) for a in arrays]
+
+def orient2d_batch(px, py, qx, qy, rx, ry):
+	"""Exact turn signs (int8 array), filtered like orient2d.  Only the
+	entries whose floating point sign is uncertain are redone exactly.
+	"""
+	px, py, qx, qy, rx, ry = _batch_arrays((px, py, qx, qy, rx, ry))
+	detleft = (px - rx) * (qy - ry)
+	detright = (py - ry) * (qx - rx)
+	det = detleft - detright
+	signs = np.sign(det).astype(np.int8)
+	counts = _counters['orient2d']
+	counts[0] += signs.size
+	if det.dtype.kind == 'f':
+		errbound = _ccwerrboundA * (np.abs(detleft) + np.abs(detright))
+		uncertain = np.flatnonzero((np.abs(det) <= errbound) & (errbound > 0))
+		counts[1] += len(uncertain)
+		for k in uncertain:
+			signs.flat[k] = _orient2d_exact(*[float(a.flat[k]) for a in (px, py, qx, qy, rx, ry)])
+	return signs
+
+def orientation_batch(px, py, qx, qy, rx, ry):
+	"""Array of turn signs: 1 for ccw, -1 for cw, 0 for collinear"""
+	return orient2d_batch(px, py, qx, qy, rx, ry)
+
+def ccw_batch(px, py, qx, qy, rx, ry):
+	return orient2d_batch(px, py, qx, qy, rx, ry) > 0
+
+def ccwon_batch(px, py, qx, qy, rx, ry):
+	return orient2d_batch(px, py, qx, qy, rx, ry) >= 0
+
+def cw_batch(px, py, qx, qy, rx, ry):
+	return orient2d_batch(px, py, qx, qy, rx, ry) < 0
+
+def cwon_batch(px, py, qx, qy, rx, ry):
+	return orient2d_batch(px, py, qx, qy, rx, ry) <= 0
+
+def collinear_batch(px, py, qx, qy, rx, ry):
+	return orient2d_batch(px, py, qx, qy, rx, ry) == 0
+
+def between_batch(px, py, qx, qy, rx, ry):
+	px, py, qx, qy, rx, ry = map(np.asarray, (px, py, qx, qy, rx, ry))
+	inx = ((px <= rx) & (rx <= qx)) | ((px >= rx) & (rx >= qx))
+	iny = ((py <= ry) & (ry <= qy)) | ((py >= ry) & (ry >= qy))
+	return collinear_batch(px, py, qx, qy, rx, ry) & np.where(px != qx, inx, iny)
+
+def intersects_batch(ax, ay, bx, by, cx, cy, dx, dy):
+	"""intersects for segments ab and cd given as coordinate arrays"""
+	return (ccw_batch(ax, ay, cx, cy, dx, dy) != ccw_batch(bx, by, cx, cy, dx, dy)) & \
+		(ccw_batch(ax, ay, bx, by, cx, cy) != ccw_batch(ax, ay, bx, by, dx, dy))
+
+def volume6_batch(ax, ay, az, bx, by, bz, cx, cy, cz):
+	"""volume6 for coordinate arrays (like volume6, d takes no part)"""
+	ax, ay, az, bx, by, bz, cx, cy, cz = map(np.asarray, (ax, ay, az, bx, by, bz, cx, cy, cz))
+	return \
+		ax * (by*cz - bz*cy) + \
+		ay * (bz*cx - bx*cz) + \
+		az * (bx*cy - by*cx)
@@ -1,7 +1,9 @@
 import math
+import numpy as np
 from predicates import *
 
 class Point3(object):
+	__slots__ = ('x', 'y', 'z')
 	
 	def __init__(self, x, y, z):
 		self.x = x
@@ -9,12 +11,12 @@ class Point3(object):
 		self.z = z
 		
 	@classmethod
-	def from_point3(self, point3):
+	def from_point3(cls, point3):
 		return cls(point3.x, point3.y, point3.z)
 		
 	@classmethod
 	def from_tuple(cls, tup):
-		return cls(tup[0], tup[1], tup[3])
+		return cls(tup[0], tup[1], tup[2])
 		
 	@property
 	def coordinates(self):
@@ -24,36 +26,55 @@ class Point3(object):
 		return "Point3(%s,%s,%s)" % (self.x, self.y, self.z)
 
 	def __eq__(self, other):
-		if not other:
+		if other is None:
 			return False
-		else:
-			return (self.x, self.y, self.z) == (other.x, other.y, other.z)
+		return self.x == other.x and self.y == other.y and self.z == other.z
 		
 	def __ne__(self, other):
-		if not other:
+		if other is None:
 			return True
-		else:
-			return (self.x, self.y, self.z) != (other.x, other.y, other.z)
+		return self.x != other.x or self.y != other.y or self.z != other.z
 	
 	def __lt__(self, other):
-		return (self.x, self.y, self.z) < (other.x, other.y, other.z)
+		if self.x != other.x:
+			return self.x < other.x
+		if self.y != other.y:
+			return self.y < other.y
+		return self.z < other.z
 	
 	def __gt__(self, other):
-		return (self.x, self.y, self.z) > (other.x, other.y, other.z)
+		if self.x != other.x:
+			return self.x > other.x
+		if self.y != other.y:
+			return self.y > other.y
+		return self.z > other.z
 	
 	def __le__(self, other):
-		return (self.x, self.y, self.z) <= (other.x, other.y, other.z)
+		return not self.__gt__(other)
 	
 	def __ge__(self, other):
-		return (self.x, self.y, self.z) >= (other.x, other.y, other.z)
+		return not self.__lt__(other)
 	
 	def __getitem__(self, index):
-		return (self.x, self.y, self.z)[index]
+		if index == 0 or index == -3:
+			return self.x
+		if index == 1 or index == -2:
+			return self.y
+		if index == 2 or index == -1:
+			return self.z
+		if isinstance(index, slice):
+			return self.coordinates[index]
+		raise IndexError('Point3 index out of range')
 		
 	def __setitem__(self, index, value):
-		temp = [self.x, self.y, self.z]
-		temp[index] = value
-		self.x, self.y, self.z = temp
+		if index == 0 or index == -3:
+			self.x = value
+		elif index == 1 or index == -2:
+			self.y = value
+		elif index == 2 or index == -1:
+			self.z = value
+		else:
+			raise IndexError('Point3 assignment index out of range')
 		
 	def __iter__(self):
 		yield self.x
@@ -61,10 +82,11 @@ class Point3(object):
 		yield self.z
 		
 	def distance_to(self, other):
-		return math.sqrt((self.x - other.x)**2, (self.y - other.y)**2, (self.z - other.z)**2)
+		return math.sqrt((self.x - other.x)**2 + (self.y - other.y)**2 + (self.z - other.z)**2)
 
 
 class Point2(object):
+	__slots__ = ('x', 'y')
 	
 	def __init__(self, x, y):
 		self.x = x
@@ -86,36 +108,43 @@ class Point2(object):
 		return "Point2(%s,%s)" % (self.x, self.y)
 		
 	def __eq__(self, other):
-		if not other:
+		if other is None:
 			return False
-		else:
-			return (self.x, self.y) == (other.x, other.y)
+		return self.x == other.x and self.y == other.y
 		
 	def __ne__(self, other):
-		if not other:
+		if other is None:
 			return True
-		else:
-			return (self.x, self.y) != (other.x, other.y)
+		return self.x != other.x or self.y != other.y
 	
 	def __lt__(self, other):
-		return (self.x, self.y) < (other.x, other.y)
+		return self.x < other.x or self.x == other.x and self.y < other.y
 	
 	def __gt__(self, other):
-		return (self.x, self.y) > (other.x, other.y)
+		return self.x > other.x or self.x == other.x and self.y > other.y
 	
 	def __le__(self, other):
-		return (self.x, self.y) <= (other.x, other.y)
+		return self.x < other.x or self.x == other.x and self.y <= other.y
 	
 	def __ge__(self, other):
-		return (self.x, self.y) >= (other.x, other.y)
+		return self.x > other.x or self.x == other.x and self.y >= other.y
 	
 	def __getitem__(self, index):
-		return (self.x, self.y)[index]
+		if index == 0 or index == -2:
+			return self.x
+		if index == 1 or index == -1:
+			return self.y
+		if isinstance(index, slice):
+			return self.coordinates[index]
+		raise IndexError('Point2 index out of range')
 		
 	def __setitem__(self, index, value):
-		temp = [self.x, self.y]
-		temp[index] = value
-		self.x, self.y = temp
+		if index == 0 or index == -2:
+			self.x = value
+		elif index == 1 or index == -1:
+			self.y = value
+		else:
+			raise IndexError('Point2 assignment index out of range')
 		
 	def __iter__(self):
 		yield self.x
@@ -125,6 +154,7 @@ class Point2(object):
 		return math.hypot(self.x - other.x, self.y - other.y)
 
 class Segment2(object):
+	__slots__ = ('start', 'end')
 	
 	def __init__(self, start, end):
 		self.start = start
@@ -140,6 +170,9 @@ class Segment2(object):
 	def __eq__(self, other):
 		return self.start==other.start and self.end==other.end
 		
+	def __ne__(self, other):
+		return self.start!=other.start or self.end!=other.end
+		
 	def intersectsProperly(self, other):
 		a, b = self.start, self.end
 		c, d = other.start, other.end
@@ -148,13 +181,143 @@ class Segment2(object):
 	def length(self):
 		return self.start.distance_to(self.end)
 		
+class FrozenPoint3(Point3):
+	"""An immutable, hashable Point3"""
+	__slots__ = ()
+	
+	def __init__(self, x, y, z):
+		object.__setattr__(self, 'x', x)
+		object.__setattr__(self, 'y', y)
+		object.__setattr__(self, 'z', z)
+		
+	def __setattr__(self, name, value):
+		raise AttributeError('FrozenPoint3 is immutable')
+		
+	def __setitem__(self, index, value):
+		raise TypeError('FrozenPoint3 is immutable')
+		
+	def __hash__(self):
+		return hash((self.x, self.y, self.z))
+		
+	def __repr__(self):
+		return "FrozenPoint3(%s,%s,%s)" % (self.x, self.y, self.z)
+
+class FrozenPoint2(Point2):
+	"""An immutable, hashable Point2"""
+	__slots__ = ()
+	
+	def __init__(self, x, y):
+		object.__setattr__(self, 'x', x)
+		object.__setattr__(self, 'y', y)
+		
+	def __setattr__(self, name, value):
+		raise AttributeError('FrozenPoint2 is immutable')
+		
+	def __setitem__(self, index, value):
+		raise TypeError('FrozenPoint2 is immutable')
+		
+	def __hash__(self):
+		return hash((self.x, self.y))
+		
+	def __repr__(self):
+		return "FrozenPoint2(%s,%s)" % (self.x, self.y)
+
+class FrozenSegment2(Segment2):
+	"""An immutable, hashable Segment2 with FrozenPoint2 endpoints"""
+	__slots__ = ()
+	
+	def __init__(self, start, end):
+		if not isinstance(start, FrozenPoint2):
+			start = FrozenPoint2(start.x, start.y)
+		if not isinstance(end, FrozenPoint2):
+			end = FrozenPoint2(end.x, end.y)
+		object.__setattr__(self, 'start', start)
+		object.__setattr__(self, 'end', end)
+		
+	def __setattr__(self, name, value):
+		raise AttributeError('FrozenSegment2 is immutable')
+		
+	def __hash__(self):
+		return hash((self.start, self.end))
+		
+	def __repr__(self):
+		return "FrozenSegment2(%s, %s)" % (self.start, self.end)
+		
+def _array_measures(x, y):
+	"""Vectorized counterpart of Polygon2._measures for coordinate arrays"""
+	px, py = x - x[0], y - y[0]
+	qx, qy = np.roll(px, -1), np.roll(py, -1)
+	cross = px * qy - qx * py
+	area2 = cross.sum()
+	perimeter = np.hypot(qx - px, qy - py).sum()
+	if area2:
+		centroid = Point2(x[0] + ((px + qx) * cross).sum() / (3.0 * area2),
+			y[0] + ((py + qy) * cross).sum() / (3.0 * area2))
+	else:
+		centroid = Point2(x.mean(), y.mean())
+	return area2, perimeter, centroid
+
+class _RingView(object):
+	"""Read-only cyclic view of a vertex sequence, rotated and/or reversed
+	without copying it.
+	"""
+	__slots__ = ('_base', '_start', '_step')
+	
+	def __init__(self, base, start=0, step=1):
+		self._base = base
+		self._start = start % len(base)
+		self._step = step
+		
+	def __len__(self):
+		return len(self._base)
+		
+	def __getitem__(self, index):
+		n = len(self._base)
+		if index < 0:
+			index += n
+		if not 0 <= index < n:
+			raise IndexError('vertex index out of range')
+		return self._base[(self._start + self._step * index) % n]
+		
+	def __iter__(self):
+		base, n = self._base, len(self._base)
+		start, step = self._start, self._step
+		for i in xrange(n):
+			yield base[(start + step * i) % n]
+			
+	def rotated(self, k):
+		"""The same ring starting k positions further along"""
+		return _RingView(self._base, self._start + self._step * k, self._step)
+		
+	def reversed(self):
+		"""The same ring traversed backwards, keeping the first vertex"""
+		return _RingView(self._base, self._start, -self._step)
+		
 class Polygon2(object):
-	def __init__(self, vertices=[]):
+	def __init__(self, vertices=[], copy=True):
 		""" Here vertices is a list of Point2s or tuples
+		
+		With copy=False any sequence of Point2-like objects (a list, a
+		PointSet2, ...) is wrapped as is, and later changes to it show
+		through the polygon.
+		
+		Measures and convexity are computed once and cached when the
+		polygon owns a copy of its vertices, until the vertices setter
+		runs; changing a vertex in place (poly[0].x = ...) goes unnoticed,
+		so assign the vertices instead.  Wrapped sequences may change
+		under the polygon, so they are measured on every call unless they
+		hold FrozenPoint2s.  Vertex positions (index) are only cached for
+		FrozenPoint2s.
 		"""
-		self.__edges = []
+		self.__index = None
+		self.__frozen = False
+		self.__owned = False
+		self.__cache = {}
 		if vertices:
-			self.vertices = vertices
+			if copy:
+				self.vertices = vertices
+			else:
+				self.__vertices = vertices
 	
 	def __repr__(self):
 		reprstr = 'Polygon2 object\nVertices: '
@@ -173,7 +336,24 @@ class Polygon2(object):
 		return len(self.__vertices)
 		
 	def index(self, item):
-		return self.__vertices.index(item)
+		"""Position of the first vertex equal to item.
+		
+		O(1) after the first call when the polygon holds FrozenPoint2
+		vertices; mutable vertices are scanned on every call.
+		"""
+		if not self.__frozen:
+			for i, vertex in enumerate(self.__vertices):
+				if vertex == item:
+					return i
+			raise ValueError('%s is not a vertex of the polygon' % (item,))
+		if self.__index is None:
+			self.__index = {}
+			for i, vertex in enumerate(self.__vertices):
+				self.__index.setdefault((vertex.x, vertex.y), i)
+		try:
+			return self.__index[item.x, item.y]
+		except KeyError:
+			raise ValueError('%s is not a vertex of the polygon' % (item,))
 			
 	@property
 	def vertices(self):
@@ -181,23 +361,56 @@ class Polygon2(object):
 			yield vertex
 	@vertices.setter
 	def vertices(self, vertices):
-		self.__vertices = [Point2.from_point2(x) for x in vertices]
-		self.__edges = []
-		lastvertex = None
-		c = self.__vertices[0]
-		for v in self.__vertices[1:]:
-			s = Segment2(c, v)
-			self.__edges.append(s)
-			c = v
-			lastvertex = v
-		if lastvertex:
-			# Close the polygon boundary
-			self.__edges.append(Segment2(v, self.__vertices[0]))
+		# frozen vertices cannot change, so they need no copy
+		self.__vertices = [x if isinstance(x, FrozenPoint2) else Point2.from_point2(x)
+			for x in vertices]
+		self.__frozen = all(isinstance(x, FrozenPoint2) for x in self.__vertices)
+		self.__owned = True
+		self.__index = None
+		self.__cache = {}
 
 	@property
 	def edges(self):
-		for edge in self.__edges:
-			yield edge
+		"""Boundary segments, built on demand from the current vertices"""
+		vertices = self.__vertices
+		n = len(vertices)
+		if n > 1:
+			c = vertices[0]
+			for i in xrange(1, n):
+				v = vertices[i]
+				yield Segment2(c, v)
+				c = v
+			# Close the polygon boundary
+			yield Segment2(c, vertices[0])
+			
+	def edge(self, index):
+		"""The boundary segment starting at vertex index"""
+		return Segment2(self[index], self[index+1])
+		
+	def _view(self, ring, reverse=False):
+		"""A polygon over the given ring that inherits the cached measures"""
+		view = Polygon2(ring, copy=False)
+		view.__frozen = self.__frozen
+		view.__owned = self.__owned
+		cache = dict(self.__cache)
+		if reverse and 'measures' in cache:
+			area2, perimeter, centroid = cache['measures']
+			cache['measures'] = -area2, perimeter, centroid
+		view.__cache = cache
+		return view
+		
+	def _ring(self):
+		if isinstance(self.__vertices, _RingView):
+			return self.__vertices
+		return _RingView(self.__vertices)
+		
+	def reversed_view(self):
+		"""The polygon with opposite orientation, sharing vertices with self"""
+		return self._view(self._ring().reversed(), True)
+		
+	def rotated_view(self, k):
+		"""The polygon starting at vertex k, sharing vertices with self"""
+		return self._view(self._ring().rotated(k))
 			
 	@property
 	def min_vertex(self):
@@ -214,12 +427,10 @@ class Polygon2(object):
 	def convert_to_ccw(self):
 		# used when we known that polygon is cw directed
 		min_index = self.index(min(self.__vertices))
-		ccw_vertices = []
-		ccw_vertices.append(self.__vertices[min_index])
-		n = len(self)
-		for i in range(1, n):
-			ccw_vertices.append(self.__vertices[(min_index-i)%n])
-		self.vertices = ccw_vertices
+		view = self._view(self._ring().rotated(min_index).reversed(), True)
+		self.__vertices = view.__vertices
+		self.__index = None
+		self.__cache = view.__cache
 	
 	def bounding_box(self):
 		minx,miny=WINSIZE
@@ -235,25 +446,139 @@ class Polygon2(object):
 				maxy=v.y
 		return minx, maxy, maxx-minx, maxy-miny
 	
+	def _cache(self):
+		"""The cache, or a throwaway dict when the vertices may change"""
+		return self.__cache if self.__owned or self.__frozen else {}
+		
+	def _measures(self):
+		"""Twice the signed area, the perimeter and the centroid, computed
+		in a single pass over the boundary.
+		"""
+		cache = self._cache()
+		try:
+			return cache['measures']
+		except KeyError:
+			pass
+		vertices = self.__vertices
+		if isinstance(getattr(vertices, 'x', None), np.ndarray):
+			# wrapped coordinate arrays (a PointSet2), measure them in one go
+			measures = cache['measures'] = _array_measures(vertices.x, vertices.y)
+			return measures
+		x0, y0 = vertices[0].x, vertices[0].y
+		area2 = cx = cy = perimeter = 0
+		px, py = vertices[-1].x - x0, vertices[-1].y - y0
+		for vertex in vertices:
+			qx, qy = vertex.x - x0, vertex.y - y0
+			cross = px * qy - qx * py
+			area2 += cross
+			cx += (px + qx) * cross
+			cy += (py + qy) * cross
+			perimeter += math.hypot(qx - px, qy - py)
+			px, py = qx, qy
+		if area2:
+			centroid = Point2(x0 + cx / (3.0 * area2), y0 + cy / (3.0 * area2))
+		else:
+			# degenerate polygon, fall back to the vertex average
+			n = float(len(vertices))
+			centroid = Point2(sum(v.x for v in vertices) / n, sum(v.y for v in vertices) / n)
+		measures = cache['measures'] = area2, perimeter, centroid
+		return measures
+		
+	@property
+	def signed_area(self):
+		"""Positive for counter-clockwise, negative for clockwise polygons"""
+		return self._measures()[0] / 2.0
+		
+	@property
+	def area(self):
+		return abs(self._measures()[0]) / 2.0
+		
+	@property
+	def perimeter(self):
+		return self._measures()[1]
+		
+	@property
+	def centroid(self):
+		return self._measures()[2]
+	
 	def is_clockwise_oriented(self):
-		n = len(self)
-		cw_turns, ccw_turns = 0, 0
-		for v in self.vertices:
-			v_index = self.index(v)
-			p = self.__vertices[(v_index-1)%n]
-			q = self.__vertices[v_index]
-			r = self.__vertices[(v_index+1)%n]
-			if ccw(p, q, r):
-				ccw_turns += 1
-			else:
-				cw_turns += 1
-		return cw_turns > ccw_turns
-		
-	def isConvex(self):
-		#FIX ME: The following fails for self intersecting polygons
-		for vertex in self.vertices:
-			previousVertex = self[self.index(vertex)-1]
-			nextVertex = self[self.index(vertex)+1]
-			if cw(previousVertex, vertex, nextVertex):
+		return self._measures()[0] < 0
+		
+	def intersecting_edges(self):
+		"""Two edges that meet other than at the vertex they share, as a
+		pair of Segment2s, or None.  A Shamos-Hoey sweep, O(n log n).
+		"""
+		from intersections import shamos_hoey
+		vertices = list(self.vertices)
+		n = len(vertices)
+		for i in xrange(n):
+			if vertices[i] == vertices[(i+1) % n]:
+				return self.edge(i-1), self.edge(i)
+		
+		def ignore(i, j):
+			# consecutive edges touch at their common vertex, but must not
+			# fold back onto each other
+			if j - i == n - 1:
+				i, j = j, i
+			elif j - i != 1:
 				return False
-		return True
+			u, v, w = vertices[i], vertices[j], vertices[(j+1) % n]
+			return not collinear(u, v, w) or \
+				(v.x - u.x) * (w.x - v.x) + (v.y - u.y) * (w.y - v.y) > 0
+		
+		pair = shamos_hoey(list(self.edges), ignore)
+		if pair is not None:
+			return self.edge(pair[0]), self.edge(pair[1])
+		return None
+		
+	def is_simple(self):
+		"""True if the boundary does not touch or cross itself"""
+		return len(self) > 2 and self.intersecting_edges() is None
+		
+	def isConvex(self, orientation='counter-clockwise'):
+		"""True if no turn goes against orientation and the boundary winds
+		once; degenerate (collinear) polygons count as convex.
+		
+		As before, only counter-clockwise polygons qualify by default;
+		pass orientation='clockwise', or None to accept either.
+		"""
+		cache = self._cache()
+		try:
+			convex, turn = cache['convex']
+		except KeyError:
+			convex, turn = cache['convex'] = self._convexity()
+		if orientation is None or not turn:
+			return convex
+		if orientation == 'clockwise':
+			return convex and turn < 0
+		return convex and turn > 0
+		
+	def _convexity(self):
+		"""Whether all turns agree in direction and the boundary winds
+		once, and that direction: 1 for left, -1 for right, 0 for none.
+		"""
+		vertices = self.__vertices
+		n = len(vertices)
+		turn = 0
+		xsign = xchanges = 0
+		p, q = vertices[-2 % n], vertices[-1]
+		for r in vertices:
+			if cw(p, q, r):
+				if turn > 0:
+					return False, turn
+				turn = -1
+			elif ccw(p, q, r):
+				if turn < 0:
+					return False, turn
+				turn = 1
+			# a convex boundary changes x direction at most twice
+			dx = r.x - q.x
+			if dx:
+				sign = 1 if dx > 0 else -1
+				if sign != xsign:
+					if xsign:
+						xchanges += 1
+					xsign = sign
+			p, q = q, r
+		# the cyclic count is even and exceeds this one by at most one
+		return xchanges <= 2, turn
@@ -1,4 +1,3 @@
-import pygame
 from events import  *
 from visuals import *
 
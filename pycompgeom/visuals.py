@@ -1,7 +1,6 @@
 WINSIZE = (640, 480)
 DEFAULTPOINTSIZE = 2
 
-import pygame
 import weakref
 from colors import *
 from events import *
@@ -278,4 +277,20 @@ class PygameWindow(object):
 		self.canvas.blit(self.point_background, (0,0))
 		pygame.display.flip()
 
-window = PygameWindow()
+class _LazyWindow(object):
+	"""The PygameWindow, created the first time it is used"""
+	def __init__(self):
+		object.__setattr__(self, '_window', None)
+		
+	def _get(self):
+		if self._window is None:
+			object.__setattr__(self, '_window', PygameWindow())
+		return self._window
+		
+	def __getattr__(self, name):
+		return getattr(self._get(), name)
+		
+	def __setattr__(self, name, value):
+		setattr(self._get(), name, value)
+
+window = _LazyWindow()
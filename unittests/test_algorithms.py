@@ -37,6 +37,107 @@ class TestHullAlgorithms(unittest.TestCase):
 		self.assertEqual(andrew(points1[:]), jarvis(points1[:]))
 		self.assertEqual(andrew(points2[:]), jarvis(points2[:]))
 		
+	def test_jarvis_leaves_input_alone(self):
+		points = points2[:]
+		jarvis(points)
+		self.assertEqual(points, points2)
+		
+	def test_chan(self):
+		self.assertEqual(chan(points0), result0)
+		self.assertEqual(chan(points1), result1)
+		self.assertEqual(chan(points2), result2)
+		points = [random_point() for i in range(5000)]
+		self.assertEqual(chan(points), andrew(points))
+		# many collinear and duplicate points spread over several groups
+		points = [Point2(random.randint(0, 9), random.randint(0, 9)) for i in range(2000)]
+		self.assertEqual(chan(points), andrew(points))
+		self.assertEqual(chan(PointSet2.from_points(points)), andrew(points))
+		
+	def test_find_bridge(self):
+		left = Polygon2([Point2(0,0), Point2(2,0), Point2(2,2), Point2(0,2)])
+		right = Polygon2([Point2(3,-1), Point2(5,0), Point2(5,3), Point2(4,4)])
+		self.assertEqual(find_bridge(left, right), Segment2(Point2(0,2), Point2(4,4)))
+		self.assertEqual(find_bridge(left, right, False), Segment2(Point2(0,0), Point2(3,-1)))
+		
+	def test_divide_and_conquer(self):
+		self.assertEqual(divide_and_conquer(points0, processes=1, chunks=4), result0)
+		self.assertEqual(divide_and_conquer(points1, processes=1, chunks=4), result1)
+		self.assertEqual(divide_and_conquer(points2, processes=1, chunks=4), result2)
+		points = [random_point() for i in range(5000)]
+		self.assertEqual(divide_and_conquer(points, processes=2, chunks=7), andrew(points))
+		points = [Point2(random.randint(0, 9), random.randint(0, 9)) for i in range(2000)]
+		for chunks in (1, 3, 16):
+			self.assertEqual(divide_and_conquer(points, processes=1, chunks=chunks), andrew(points))
+		
+	def test_akl_toussaint(self):
+		points = [random_point() for i in range(5000)]
+		reset_prefilter_statistics()
+		kept, removed = akl_toussaint(points, return_removed=True)
+		self.assertTrue(removed > 0)
+		self.assertEqual(len(kept) + removed, len(points))
+		self.assertEqual(prefilter_statistics(), (len(points), removed))
+		self.assertEqual(andrew(kept), andrew(points))
+		pointset = PointSet2.from_points(points)
+		self.assertEqual(len(akl_toussaint(pointset)), len(kept))
+		# degenerate octagons must not lose hull vertices
+		for points in (points0, points1, points2, [Point2(1,1)], []):
+			self.assertEqual(andrew(akl_toussaint(points)), andrew(points))
+		
+	def test_prefilter(self):
+		points = [random_point() for i in range(2000)]
+		result = andrew(points)
+		self.assertEqual(andrew(points, prefilter=True), result)
+		self.assertEqual(jarvis(points, prefilter=True), result)
+		self.assertEqual(chan(points, prefilter=True), result)
+		self.assertEqual(divide_and_conquer(points, processes=1, prefilter=True), result)
+		self.assertEqual(andrew(points2, prefilter=True), result2)
+		
+	def test_online_hull(self):
+		for points in (points0, points1, points2):
+			hull = OnlineHull()
+			hull.extend(points)
+			self.assertEqual(hull.vertices, andrew(points))
+		hull = OnlineHull()
+		points = []
+		for batch in range(10):
+			new = [random_point() for i in range(500)]
+			hull.extend(new)
+			points.extend(new)
+			self.assertEqual(hull.vertices, andrew(points))
+			self.assertEqual(len(hull), len(hull.vertices))
+		self.assertEqual(list(hull.hull.vertices), andrew(points))
+		# collinear and duplicate points
+		points = [Point2(random.randint(0, 9), random.randint(0, 9)) for i in range(500)]
+		hull = OnlineHull(points)
+		self.assertEqual(hull.vertices, andrew(points))
+		self.assertFalse(hull.insert(Point2(5, 5)))
+		self.assertTrue(hull.insert(Point2(20, 5)))
+
+	def test_streaming(self):
+		points = [random_point() for i in range(1000)] + [Point2(-1, 0.5), Point2(2, 0.5)]
+		chunks = [points[k:k+100] for k in range(0, len(points), 100)]
+		self.assertEqual(streaming_hull(chunks), andrew(points))
+		self.assertEqual(streaming_hull(chunks, prefilter=False), andrew(points))
+		self.assertEqual(streaming_hull(PointSet2.from_points(chunk) for chunk in chunks), andrew(points))
+		self.assertEqual(streaming_hull([]), [])
+		hull = andrew(points)
+		for p, q in zip(streaming_hull(chunks), hull):
+			self.assertTrue(p is q)
+		self.assertEqual(streaming_bounding_box(chunks), (-1, min(p.y for p in points), 2, max(p.y for p in points)))
+		self.assertEqual(streaming_bounding_box([[], []]), None)
+
+	def test_triangulate(self):
+		comb = [Point2(0, 0), Point2(6, 0), Point2(6, 4), Point2(5, 1), Point2(4, 4),
+			Point2(3, 1), Point2(2, 4), Point2(1, 1), Point2(0, 4)]
+		for vertices in (comb, comb[::-1], [Point2(0, 0), Point2(2, 0), Point2(4, 0), Point2(4, 2)]):
+			poly = Polygon2(vertices)
+			triangles = triangulate(poly)
+			self.assertEqual(len(triangles), len(vertices) - 2)
+			for i, j, k in triangles:
+				self.assertTrue(area2(vertices[i], vertices[j], vertices[k]) >= 0)
+			total = sum(area2(vertices[i], vertices[j], vertices[k]) for i, j, k in triangles)
+			self.assertEqual(total / 2.0, poly.area)
+
 
 if __name__ == '__main__':
 	unittest.main(verbosity=2)
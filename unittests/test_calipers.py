@@ -0,0 +1,107 @@
+from pycompgeom.primitives import *
+from pycompgeom.algorithms import *
+from pycompgeom.calipers import *
+
+import math
+import random
+import unittest
+
+def random_point():
+	return Point2(random.random(), random.random())
+
+def distance(p, q):
+	return math.hypot(p.x-q.x, p.y-q.y)
+
+def brute_width(hull):
+	n = len(hull)
+	best = None
+	for i in range(n):
+		a, b = hull[i], hull[(i+1) % n]
+		h = max(abs(area2(a, b, p)) for p in hull) / distance(a, b)
+		if best is None or h < best:
+			best = h
+	return best
+
+def rectangle_area(r):
+	return distance(r[0], r[1]) * distance(r[1], r[2])
+
+def rectangle_perimeter(r):
+	return 2 * (distance(r[0], r[1]) + distance(r[1], r[2]))
+
+def encloses(r, points, eps=1e-9):
+	for k in range(4):
+		a, b = r[k], r[(k+1) % 4]
+		for p in points:
+			if area2(a, b, p) < -eps * distance(a, b):
+				return False
+	return True
+
+square = [Point2(0,0), Point2(4,0), Point2(4,4), Point2(0,4), Point2(1,2), Point2(3,1)]
+
+class TestCalipers(unittest.TestCase):
+
+	def test_diameter(self):
+		p, q = diameter(square)
+		self.assertEqual(distance(p, q), math.hypot(4, 4))
+		for n in (2, 3, 10, 500):
+			points = [random_point() for i in range(n)]
+			p, q = diameter(points)
+			best = max(distance(a, b) for a in points for b in points)
+			self.assertAlmostEqual(distance(p, q), best)
+
+	def test_too_few_points(self):
+		for points in ([], [Point2(1,1)], [Point2(1,1), Point2(1,1)]):
+			for measure in (diameter, width, min_area_rectangle, min_perimeter_rectangle):
+				self.assertRaises(ValueError, measure, points)
+		self.assertEqual(sorted(diameter([Point2(2,3), Point2(1,1)])), [Point2(1,1), Point2(2,3)])
+		
+	def test_tuple_hull(self):
+		hull = tuple(andrew(square))
+		p, q = diameter(hull, is_hull=True)
+		self.assertEqual(distance(p, q), math.hypot(4, 4))
+		self.assertEqual(width(hull, is_hull=True), 4)
+		self.assertEqual(rectangle_area(min_area_rectangle(hull, is_hull=True)), 16)
+
+	def test_algorithms_names(self):
+		# diameter and antipodal_pairs used to live in algorithms
+		import pycompgeom.algorithms
+		self.assertEqual(pycompgeom.algorithms.diameter(square), diameter(square))
+		self.assertEqual(list(pycompgeom.algorithms.andipodal_pairs(square)), list(antipodal_pairs(square)))
+		
+	def test_width(self):
+		self.assertEqual(width(square), 4)
+		self.assertEqual(width([Point2(0,0), Point2(1,1), Point2(3,3)]), 0)
+		for n in (3, 10, 500):
+			points = [random_point() for i in range(n)]
+			self.assertAlmostEqual(width(points), brute_width(andrew(points)))
+
+	def test_rectangles(self):
+		self.assertEqual(rectangle_area(min_area_rectangle(square)), 16)
+		points = [Point2(0,0), Point2(2,2), Point2(1,3), Point2(-1,1)]
+		r = min_area_rectangle(points)
+		self.assertAlmostEqual(rectangle_area(r), 4)
+		for n in (3, 10, 500):
+			points = [random_point() for i in range(n)]
+			area = min_area_rectangle(points)
+			perimeter = min_perimeter_rectangle(points)
+			self.assertTrue(encloses(area, points))
+			self.assertTrue(encloses(perimeter, points))
+			self.assertTrue(rectangle_area(area) <= rectangle_area(perimeter) + 1e-12)
+			self.assertTrue(rectangle_perimeter(perimeter) <= rectangle_perimeter(area) + 1e-12)
+			self.assertTrue(rectangle_area(area) <= 1)
+
+	def test_precomputed_hull(self):
+		points = [random_point() for i in range(300)]
+		hull = andrew(points)
+		self.assertEqual(diameter(hull, is_hull=True), diameter(points))
+		self.assertEqual(width(hull, is_hull=True), width(points))
+		self.assertEqual(min_area_rectangle(hull, is_hull=True), min_area_rectangle(points))
+		# any starting vertex and a Polygon2 will do
+		rotated = hull[5:] + hull[:5]
+		self.assertEqual(set(diameter(rotated, is_hull=True)), set(diameter(points)))
+		self.assertAlmostEqual(width(Polygon2(rotated), is_hull=True), width(points))
+		self.assertRaises(ValueError, width, [Point2(1,1)], is_hull=True)
+
+
+if __name__ == '__main__':
+	unittest.main(verbosity=2)
@@ -0,0 +1,187 @@
+from pycompgeom.primitives import *
+from pycompgeom.generators import *
+from pycompgeom.algorithms import andrew
+
+import numpy as np
+import os
+import shutil
+import tempfile
+import unittest
+
+generators = [star_polygon, monotone_polygon, space_partition_polygon, two_opt_polygon]
+
+class TestRandomPoints(unittest.TestCase):
+
+	def test_window(self):
+		points = random_points_in_window(100, (200, 100), 20, seed=1)
+		self.assertEqual(len(points), 100)
+		for p in points:
+			self.assertTrue(20 < p.x < 180 and 20 < p.y < 80)
+		self.assertEqual(random_points_in_window(100, (200, 100), 20, seed=1), points)
+
+	def test_floats(self):
+		pointset = random_pointset(1000, (200, 100), 20, seed=2, integer=False)
+		self.assertEqual(pointset.x.dtype.kind, 'f')
+		self.assertTrue((pointset.x >= 20).all() and (pointset.x < 180).all())
+		self.assertTrue((pointset.y >= 20).all() and (pointset.y < 80).all())
+
+	def test_streams(self):
+		num = 2 * (1 << 20) + 7
+		serial = random_pointset(num, seed=3)
+		parallel = random_pointset(num, seed=3, processes=2)
+		self.assertEqual(len(parallel), num)
+		self.assertTrue((serial.x == parallel.x).all() and (serial.y == parallel.y).all())
+		self.assertFalse((random_pointset(num, seed=4).x == serial.x).all())
+
+class TestStreaming(unittest.TestCase):
+
+	def test_chunks(self):
+		num = (1 << 20) + 1000
+		chunks = list(iter_random_pointsets(num, 50000, seed=5))
+		self.assertTrue(max(len(chunk) for chunk in chunks) <= 50000)
+		whole = random_pointset(num, seed=5)
+		self.assertTrue((np.concatenate([chunk.x for chunk in chunks]) == whole.x).all())
+		self.assertTrue((np.concatenate([chunk.y for chunk in chunks]) == whole.y).all())
+		points = [p for chunk in iter_random_points(100, 30, seed=5) for p in chunk]
+		self.assertEqual(points, random_points_in_window(100, seed=5))
+
+	def test_segments(self):
+		points = [Point2(i, i % 3) for i in range(10)]
+		chunks = list(iter_segments_from_points(iter(points), 4))
+		self.assertEqual([len(chunk) for chunk in chunks], [4, 4, 1])
+		self.assertEqual(chunks[2][0], Segment2(points[8], points[9]))
+		chunks = list(iter_random_segments(10, 4, seed=1))
+		self.assertEqual([len(chunk) for chunk in chunks], [4, 4, 2])
+		self.assertEqual(len(random_segments(7, seed=1)), 7)
+
+class TestDistributions(unittest.TestCase):
+
+	def test_sizes(self):
+		for name in DISTRIBUTIONS:
+			pointset = random_distribution(name, 1000, seed=1, window_size=(400, 300))
+			self.assertEqual(len(pointset), 1000)
+			again = random_distribution(name, 1000, seed=1, window_size=(400, 300))
+			self.assertTrue((pointset.x == again.x).all() and (pointset.y == again.y).all())
+		self.assertRaises(ValueError, random_distribution, 'spiral', 10)
+
+	def test_shapes(self):
+		circle = random_distribution('circle', 100, seed=2, window_size=(400, 300))
+		radii = np.hypot(circle.x - 200, circle.y - 150)
+		self.assertTrue(np.allclose(radii, 150))
+		grid = random_distribution('grid', 90, seed=2, window_size=(400, 300))
+		self.assertEqual(len(set(zip(grid.x, grid.y))), 90)
+		self.assertEqual(sorted(set(grid.x)), range(0, 300, 30))
+		self.assertTrue((grid.y < 300).all() and (grid.y % 30 == 0).all())
+
+	def test_cache(self):
+		cache_dir = tempfile.mkdtemp()
+		try:
+			first = benchmark_points('clusters', 500, 3, cache_dir=cache_dir)
+			self.assertEqual(len(os.listdir(cache_dir)), 1)
+			cached = benchmark_points('clusters', 500, 3, cache_dir=cache_dir)
+			self.assertTrue((first.x == cached.x).all() and (first.y == cached.y).all())
+			benchmark_points('clusters', 500, 4, cache_dir=cache_dir)
+			self.assertEqual(len(os.listdir(cache_dir)), 2)
+			benchmark_points('clusters', 500, None, cache_dir=cache_dir)
+			benchmark_points('clusters', 500, np.random.RandomState(5), cache_dir=cache_dir)
+			self.assertEqual(len(os.listdir(cache_dir)), 2)
+		finally:
+			shutil.rmtree(cache_dir)
+
+class TestSimplePolygons(unittest.TestCase):
+
+	def test_simple(self):
+		for generator in generators:
+			for num in (3, 4, 10, 100):
+				for seed in range(5):
+					poly = generator(num, seed=seed)
+					self.assertEqual(len(poly), num)
+					self.assertTrue(poly.is_simple())
+					self.assertFalse(poly.is_clockwise_oriented())
+
+	def test_seed(self):
+		for generator in generators:
+			first = list(generator(50, seed=7).vertices)
+			self.assertEqual(list(generator(50, seed=7).vertices), first)
+			self.assertNotEqual(list(generator(50, seed=8).vertices), first)
+
+	def test_given_points(self):
+		points = [Point2(i, (i * i) % 17) for i in range(17)]
+		for generator in generators:
+			poly = generator(points=points)
+			self.assertTrue(poly.is_simple())
+			self.assertEqual(sorted(poly.vertices), sorted(points))
+
+	def test_monotone(self):
+		vertices = list(monotone_polygon(100, seed=1).vertices)
+		first = vertices.index(min(vertices))
+		vertices = vertices[first:] + vertices[:first]
+		turns = sum(1 for k in range(len(vertices))
+			if (vertices[k].x < vertices[k-1].x) != (vertices[(k+1) % len(vertices)].x < vertices[k].x))
+		self.assertEqual(turns, 2)
+
+	def test_cached_measures(self):
+		for generator in generators:
+			poly = generator(50, seed=3)
+			area, convex = poly.area, poly.isConvex()
+			vertices = list(poly.vertices)
+			# the measures are cached: moving a vertex in place goes unnoticed
+			vertices[0].x += 100
+			self.assertEqual(poly.area, area)
+			self.assertEqual(poly.isConvex(), convex)
+			# until the vertices are assigned
+			poly.vertices = vertices
+			self.assertNotEqual(poly.area, area)
+
+	def test_random_simple_polygon(self):
+		self.assertTrue(random_simple_polygon(30).is_simple())
+		for seed in range(100):
+			self.assertTrue(random_simple_polygon(200, seed=seed).is_simple())
+		self.assertTrue(random_simple_polygon(3000, seed=1).is_simple())
+
+class TestConvexPolygons(unittest.TestCase):
+
+	def test_convex(self):
+		for num in (3, 4, 10, 1000):
+			for seed in range(5):
+				poly = convex_polygon(num, seed=seed, window_size=(200, 100), offset=10)
+				vertices = list(poly.vertices)
+				self.assertEqual(len(vertices), num)
+				self.assertEqual(len(andrew(vertices)), num)
+				self.assertFalse(poly.is_clockwise_oriented())
+				for p in vertices:
+					self.assertTrue(10 <= p.x <= 190 and 10 <= p.y <= 90)
+
+	def test_seed(self):
+		first = list(convex_polygon(50, seed=7).vertices)
+		self.assertEqual(list(convex_polygon(50, seed=7).vertices), first)
+		self.assertNotEqual(list(convex_polygon(50, seed=8).vertices), first)
+
+	def test_too_few(self):
+		for num in (0, 1, 2):
+			self.assertRaises(ValueError, convex_polygon, num, seed=1)
+
+class TestPolygonSampler(unittest.TestCase):
+
+	def test_inside(self):
+		# an L shape of area 3 in the box [0,2]x[0,2]
+		ell = Polygon2([Point2(0, 0), Point2(2, 0), Point2(2, 1), Point2(1, 1), Point2(1, 2), Point2(0, 2)])
+		sampler = PolygonSampler(ell)
+		self.assertEqual(sampler.area, 3)
+		points = sampler.sample(100000, seed=1)
+		self.assertEqual(len(points), 100000)
+		self.assertTrue(((points.x >= 0) & (points.y >= 0) & (points.x <= 2) & (points.y <= 2)).all())
+		self.assertFalse(((points.x > 1) & (points.y > 1)).any())
+		# each unit square holds a third of the points
+		lower_right = np.mean((points.x > 1) & (points.y < 1))
+		self.assertAlmostEqual(lower_right, 1 / 3.0, delta=0.01)
+
+	def test_batches(self):
+		sampler = PolygonSampler(star_polygon(30, seed=1))
+		batches = list(sampler.batches(2500, 1000, seed=2))
+		self.assertEqual([len(b) for b in batches], [1000, 1000, 500])
+		again = list(sampler.batches(2500, 1000, seed=2))
+		self.assertTrue((batches[2].x == again[2].x).all())
+
+if __name__ == '__main__':
+	unittest.main(verbosity=2)
@@ -0,0 +1,79 @@
+from pycompgeom.primitives import *
+from pycompgeom.predicates import *
+from pycompgeom.intersections import *
+
+import random
+import unittest
+
+def random_segment(grid=None):
+	if grid:
+		coordinate = lambda: random.randint(0, grid)
+	else:
+		coordinate = random.random
+	return Segment2(Point2(coordinate(), coordinate()), Point2(coordinate(), coordinate()))
+
+def meet(s, t):
+	a, b, c, d = s.start, s.end, t.start, t.end
+	o1, o2 = orient2d(a, b, c), orient2d(a, b, d)
+	o3, o4 = orient2d(c, d, a), orient2d(c, d, b)
+	if o1 == o2 == o3 == o4 == 0:
+		return max(min(a, b), min(c, d)) <= min(max(a, b), max(c, d))
+	return o1 * o2 <= 0 and o3 * o4 <= 0
+
+def brute_pairs(segments):
+	return set((i, j) for i in range(len(segments)) for j in range(i+1, len(segments))
+		if meet(segments[i], segments[j]))
+
+def sweep_pairs(segments):
+	index = dict((id(s), i) for i, s in enumerate(segments))
+	return set(tuple(sorted((index[id(s)], index[id(t)])))
+		for s, t in intersecting_pairs(segments))
+
+class TestSegmentIntersections(unittest.TestCase):
+
+	def test_cross(self):
+		s = Segment2(Point2(0,0), Point2(4,4))
+		t = Segment2(Point2(0,4), Point2(4,0))
+		u = Segment2(Point2(5,0), Point2(6,1))
+		result = segment_intersections([s, t, u])
+		self.assertEqual(result, [(Point2(2,2), [s, t])])
+		self.assertEqual(intersecting_pairs([s, t, u]), [(s, t)])
+
+	def test_degenerate(self):
+		# many segments through one point, a vertical one, an overlapping
+		# pair and a segment starting on the interior of another
+		segments = [Segment2(Point2(0,0), Point2(4,4)), Segment2(Point2(0,4), Point2(4,0)),
+			Segment2(Point2(2,0), Point2(2,4)), Segment2(Point2(0,2), Point2(4,2)),
+			Segment2(Point2(3,3), Point2(5,5)), Segment2(Point2(1,1), Point2(1,3))]
+		result = segment_intersections(segments)
+		self.assertEqual(result[0][0], Point2(1,1))
+		self.assertTrue((Point2(2,2), segments[:4]) in result)
+		self.assertEqual(sweep_pairs(segments), brute_pairs(segments))
+
+	def test_random(self):
+		for grid in (3, 10, None):
+			for trial in range(30):
+				segments = [random_segment(grid) for i in range(random.randint(1, 15))]
+				self.assertEqual(sweep_pairs(segments), brute_pairs(segments))
+		segments = [random_segment() for i in range(100)]
+		self.assertEqual(sweep_pairs(segments), brute_pairs(segments))
+
+	def test_shamos_hoey(self):
+		for grid in (3, 10, None):
+			for trial in range(30):
+				segments = [random_segment(grid) for i in range(random.randint(1, 15))]
+				pair = shamos_hoey(segments)
+				if brute_pairs(segments):
+					self.assertTrue(meet(*[segments[i] for i in pair]))
+				else:
+					self.assertEqual(pair, None)
+		# contacts at shared endpoints can be excused
+		chain = [Segment2(Point2(i, i % 2), Point2(i+1, (i+1) % 2)) for i in range(10)]
+		self.assertEqual(shamos_hoey(chain), (0, 1))
+		self.assertEqual(shamos_hoey(chain, lambda i, j: j == i + 1), None)
+		chain.append(Segment2(Point2(3, 1), Point2(3, 5)))
+		self.assertEqual(shamos_hoey(chain, lambda i, j: j == i + 1), (2, 10))
+		
+
+if __name__ == '__main__':
+	unittest.main(verbosity=2)
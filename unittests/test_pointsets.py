@@ -0,0 +1,45 @@
+from pycompgeom.primitives import *
+from pycompgeom.pointsets import *
+from pycompgeom.algorithms import *
+
+import random
+import unittest
+
+def random_point():
+	return Point2(random.random(), random.random())
+
+points0 = [Point2(i/10, i%10) for i in range(100)]
+points1 = [Point2(i, i) for i in range(100)] + [Point2(99,0)]
+points2 = [Point2(i, i) for i in range(100)] + [Point2(i+1, i) for i in range(100)]
+
+class TestPointSet2(unittest.TestCase):
+
+	def test_round_trip(self):
+		points = [random_point() for i in range(50)]
+		pointset = PointSet2.from_points(points)
+		self.assertEqual(len(pointset), 50)
+		self.assertEqual(pointset.to_points(), points)
+		self.assertEqual(list(pointset), points)
+
+	def test_views_share_memory(self):
+		pointset = PointSet2.from_points(points1)
+		view = pointset[-1]
+		self.assertEqual(view, Point2(99, 0))
+		view.y = 5
+		self.assertEqual(pointset.y[-1], 5)
+		sliced = pointset[10:20]
+		sliced[0] = Point2(-1, -1)
+		self.assertEqual(pointset[10], Point2(-1, -1))
+
+	def test_hulls(self):
+		for points in (points0, points1, points2):
+			pointset = PointSet2.from_points(points)
+			self.assertEqual(andrew(pointset), andrew(points[:]))
+			self.assertEqual(jarvis(pointset), andrew(points[:]))
+		points = [random_point() for i in range(500)]
+		pointset = PointSet2.from_points(points)
+		self.assertEqual(andrew(pointset), andrew(points))
+		self.assertEqual(jarvis(pointset), andrew(points))
+
+if __name__ == '__main__':
+	unittest.main(verbosity=2)
@@ -1,6 +1,8 @@
 from pycompgeom.primitives import *
 from pycompgeom.predicates import *
 
+from fractions import Fraction
+import numpy as np
 import random
 import unittest
 
@@ -16,6 +18,95 @@ class TestPredicates(unittest.TestCase):
 	def test_cw_vs_ccw(self):
 		self.assertFalse(cw(self.a,self.b,self.c) and ccw(self.a,self.b,self.c))
 		self.assertFalse(cwon(self.a,self.b,self.c) and ccwon(self.a,self.b,self.c))
+		
+	def test_batch_kernels(self):
+		# small integer coordinates give plenty of collinear triples
+		p = [Point2(random.randint(0, 4), random.randint(0, 4)) for i in range(300)]
+		q = [Point2(random.randint(0, 4), random.randint(0, 4)) for i in range(300)]
+		r = [Point2(random.randint(0, 4), random.randint(0, 4)) for i in range(300)]
+		s = [Point2(random.randint(0, 4), random.randint(0, 4)) for i in range(300)]
+		coords = lambda points: ([t.x for t in points], [t.y for t in points])
+		args = coords(p) + coords(q) + coords(r)
+		for scalar, batch in ((area2, area2_batch), (ccw, ccw_batch), (cwon, cwon_batch), \
+				(collinear, collinear_batch), (between, between_batch)):
+			self.assertEqual(list(batch(*args)), map(scalar, p, q, r))
+		self.assertEqual(list(orientation_batch(*args)), \
+			[cmp(area2(a, b, c), 0) for a, b, c in zip(p, q, r)])
+		segments = lambda a, b: map(Segment2, a, b)
+		self.assertEqual(list(intersects_batch(*(args + coords(s)))), \
+			map(intersects, segments(p, q), segments(r, s)))
+		# one directed line against many points
+		self.assertEqual(list(ccw_batch(0, 0, 1, 1, *coords(r))), \
+			[ccw(Point2(0, 0), Point2(1, 1), t) for t in r])
+
+def exact_area2(p, q, r):
+	p, q, r = [Point2(Fraction(a.x), Fraction(a.y)) for a in (p, q, r)]
+	return cmp(area2(p, q, r), 0)
+
+class TestRobustPredicates(unittest.TestCase):
+	
+	def test_orient2d_near_degenerate(self):
+		# points a few ulps away from the line y = x
+		q, r = Point2(12.0, 12.0), Point2(24.0, 24.0)
+		reset_robust_statistics()
+		for i in range(32):
+			for j in range(32):
+				p = Point2(0.5 + i * 2.0**-53, 0.5 + j * 2.0**-53)
+				self.assertEqual(orient2d(p, q, r), exact_area2(p, q, r))
+		calls, exact = robust_statistics()['orient2d']
+		self.assertEqual(calls, 32 * 32)
+		self.assertTrue(exact > 0)
+		reset_robust_statistics()
+		self.assertEqual(orient2d(Point2(0.5, 0.75), q, r), 1)
+		self.assertEqual(robust_statistics()['orient2d'], (1, 0))
+		
+	def test_exact_inputs_skip_fallback(self):
+		reset_robust_statistics()
+		self.assertEqual(orient2d(Point2(0, 0), Point2(3, 3), Point2(7, 7)), 0)
+		self.assertEqual(orient2d(Point2(0, 0), Point2(3, 3), Point2(7, 8)), 1)
+		self.assertEqual(robust_statistics()['orient2d'], (2, 0))
+		
+	def test_orient3d_and_incircle(self):
+		a, b, c = Point3(0, 0, 0), Point3(1, 0, 0), Point3(0, 1, 0)
+		self.assertEqual(orient3d(a, b, c, Point3(0.25, 0.25, -1e-30)), 1)
+		self.assertEqual(orient3d(a, b, c, Point3(0.25, 0.25, 1e-30)), -1)
+		self.assertEqual(orient3d(a, b, c, Point3(0.25, 0.25, 0.0)), 0)
+		a, b, c = Point2(1.0, 0.0), Point2(0.0, 1.0), Point2(-1.0, 0.0)
+		self.assertEqual(incircle(a, b, c, Point2(0.0, -1.0)), 0)
+		self.assertEqual(incircle(a, b, c, Point2(0.0, -1.0 + 2.0**-52)), 1)
+		self.assertEqual(incircle(a, b, c, Point2(0.0, -1.0 - 2.0**-52)), -1)
+		
+	def test_orient2d_batch(self):
+		x = [0.5 + i * 2.0**-53 for i in range(64)]
+		y = [0.5 + (i % 7) * 2.0**-53 for i in range(64)]
+		expected = [exact_area2(Point2(a, b), Point2(12.0, 12.0), Point2(24.0, 24.0)) for a, b in zip(x, y)]
+		self.assertEqual(list(orient2d_batch(x, y, 12.0, 12.0, 24.0, 24.0)), expected)
+		
+	def test_float32_near_degenerate(self):
+		# float32 arithmetic rounds far beyond the float64 error bound
+		f = np.float32
+		q, r = Point2(f(12.0), f(12.0)), Point2(f(24.0), f(24.0))
+		x = np.array([0.5 + i * 2.0**-24 for i in range(16) for j in range(16)], dtype=f)
+		y = np.array([0.5 + j * 2.0**-24 for i in range(16) for j in range(16)], dtype=f)
+		points = [Point2(a, b) for a, b in zip(x, y)]
+		expected = [exact_area2(*[Point2(float(t.x), float(t.y)) for t in (p, q, r)]) for p in points]
+		self.assertEqual(set(expected), set([-1, 0, 1]))
+		self.assertEqual([orient2d(p, q, r) for p in points], expected)
+		self.assertEqual(list(orient2d_batch(x, y, f(12.0), f(12.0), f(24.0), f(24.0))), expected)
+		
+	def test_large_int64_near_degenerate(self):
+		# the cross products of coordinates near 2^40 overflow int64 and
+		# wrap around whenever the determinant exceeds 2^63
+		base, step = 2**40, 2**33
+		x = [base + i * step for i in range(-2, 3) for j in range(-2, 3)] + [base] * 3
+		y = [base + j * step for i in range(-2, 3) for j in range(-2, 3)] + [base - 2, base - 1, base]
+		x, y = np.array(x, dtype=np.int64), np.array(y, dtype=np.int64)
+		q, r = (3 * base, 3 * base + 1), (5 * base, 5 * base + 3)
+		expected = [exact_area2(Point2(int(a), int(b)), Point2(*q), Point2(*r)) for a, b in zip(x, y)]
+		self.assertEqual(set(expected), set([-1, 0, 1]))
+		q64, r64 = Point2(*map(np.int64, q)), Point2(*map(np.int64, r))
+		self.assertEqual([orient2d(Point2(a, b), q64, r64) for a, b in zip(x, y)], expected)
+		self.assertEqual(list(orient2d_batch(x, y, q[0], q[1], r[0], r[1])), expected)
 
 if __name__ == '__main__':
 	unittest.main(verbosity=2)
@@ -1,6 +1,9 @@
 from pycompgeom.primitives import Point2, Segment2, Polygon2
+from pycompgeom.primitives import FrozenPoint2, FrozenSegment2
 
 import random
+import subprocess
+import sys
 import unittest
 
 def random_point():
@@ -29,6 +32,128 @@ class TestPrimitiveInstantiations(unittest.TestCase):
 		self.assertEqual(s1.start, s2.start)
 		self.assertEqual(s1.end, s2.end)
 		self.assertEqual(s1, s2)
+		
+	def test_slots(self):
+		a = random_point()
+		self.assertRaises(AttributeError, setattr, a, 'z', 0)
+		a[0], a[-1] = 3, 4
+		self.assertEqual(a.coordinates, (3, 4))
+		self.assertEqual(a[:], (3, 4))
+		self.assertRaises(IndexError, a.__getitem__, 2)
+		
+	def test_frozen(self):
+		a = random_point()
+		fa = FrozenPoint2.from_point2(a)
+		self.assertEqual(a, fa)
+		self.assertRaises(AttributeError, setattr, fa, 'x', 0)
+		self.assertRaises(TypeError, fa.__setitem__, 0, 0)
+		self.assertEqual(len(set([fa, FrozenPoint2(a.x, a.y)])), 1)
+		s = FrozenSegment2(a, random_point())
+		self.assertTrue(isinstance(s.start, FrozenPoint2))
+		self.assertEqual({s: 1}[FrozenSegment2(s.start, s.end)], 1)
+		
+	def test_polygon_index(self):
+		points = [Point2(i, i*i) for i in range(10)]
+		poly = Polygon2(points)
+		for i, p in enumerate(points):
+			self.assertEqual(poly.index(p), i)
+		self.assertRaises(ValueError, poly.index, Point2(-1, -1))
+		# vertices changed in place are found where they are now
+		poly[3].x = -1
+		self.assertEqual(poly.index(Point2(-1, 9)), 3)
+		self.assertRaises(ValueError, poly.index, points[3])
+		frozen = Polygon2([FrozenPoint2(p.x, p.y) for p in points])
+		self.assertEqual(frozen.index(points[3]), 3)
+		self.assertEqual(frozen.index(Point2(9, 81)), 9)
+		
+	def test_polygon_measures(self):
+		square = [Point2(0,0), Point2(2,0), Point2(2,2), Point2(0,2)]
+		poly = Polygon2(square)
+		self.assertEqual(poly.signed_area, 4)
+		self.assertEqual(poly.perimeter, 8)
+		self.assertEqual(poly.centroid, Point2(1, 1))
+		self.assertFalse(poly.is_clockwise_oriented())
+		self.assertTrue(poly.isConvex())
+		poly.vertices = reversed(square)
+		self.assertEqual(poly.signed_area, -4)
+		self.assertEqual(poly.area, 4)
+		self.assertTrue(poly.is_clockwise_oriented())
+		self.assertFalse(poly.isConvex())
+		self.assertTrue(poly.isConvex('clockwise'))
+		self.assertTrue(poly.isConvex(None))
+		self.assertTrue(Polygon2([Point2(0,0), Point2(1,1), Point2(2,2)]).isConvex())
+		# non-convex but mostly left turns, and a pentagram
+		dart = [Point2(0,0), Point2(4,0), Point2(4,4), Point2(3,1), Point2(1,1), Point2(0,4)]
+		self.assertFalse(Polygon2(dart).is_clockwise_oriented())
+		self.assertFalse(Polygon2(dart).isConvex())
+		star = [Point2(0,0), Point2(2,6), Point2(4,0), Point2(-1,4), Point2(5,4)]
+		self.assertFalse(Polygon2(star).isConvex())
+		
+	def test_polygon_views(self):
+		points = [Point2(0,4), Point2(2,2), Point2(4,4), Point2(4,0), Point2(0,0)]
+		poly = Polygon2(points, copy=False)
+		self.assertTrue(poly[0] is points[0])
+		edges = list(poly.edges)
+		self.assertEqual(len(edges), 5)
+		self.assertEqual(edges[-1], Segment2(points[-1], points[0]))
+		self.assertEqual(poly.edge(2), edges[2])
+		rotated = poly.rotated_view(2)
+		self.assertTrue(rotated[0] is points[2])
+		self.assertEqual(list(rotated.edges), edges[2:] + edges[:2])
+		backwards = poly.reversed_view()
+		self.assertEqual(list(backwards.vertices), [points[0]] + points[:0:-1])
+		self.assertEqual(backwards.signed_area, -poly.signed_area)
+		poly.convert_to_ccw()
+		self.assertEqual(list(poly.vertices), [points[4], points[3], points[2], points[1], points[0]])
+		self.assertFalse(poly.is_clockwise_oriented())
+		self.assertEqual(poly.index(points[2]), 2)
+		
+	def test_polygon_changes(self):
+		points = [Point2(0,0), Point2(2,0), Point2(2,2), Point2(0,2)]
+		poly = Polygon2(points, copy=False)
+		self.assertEqual(poly.area, 4)
+		self.assertTrue(poly.isConvex())
+		points[1].x = 4
+		points.append(Point2(1,1))
+		self.assertEqual(poly.area, 5)
+		self.assertFalse(poly.isConvex())
+		self.assertEqual(poly.index(Point2(1,1)), 4)
+		# a copy is measured once, until its vertices are assigned
+		copied = Polygon2(points)
+		self.assertEqual(copied.area, 5)
+		copied[0].x = -2
+		self.assertEqual(copied.area, 5)
+		copied.vertices = list(copied.vertices)
+		self.assertEqual(copied.area, 6)
+		frozen = Polygon2([FrozenPoint2(p.x, p.y) for p in points])
+		self.assertEqual(frozen.area, 5)
+		self.assertEqual(frozen.reversed_view().signed_area, -5)
 
+	def test_polygon_is_simple(self):
+		dart = [Point2(0,0), Point2(4,0), Point2(4,4), Point2(3,1), Point2(1,1), Point2(0,4)]
+		self.assertTrue(Polygon2(dart).is_simple())
+		self.assertEqual(Polygon2(dart).intersecting_edges(), None)
+		star = [Point2(0,0), Point2(2,6), Point2(4,0), Point2(-1,4), Point2(5,4)]
+		self.assertFalse(Polygon2(star).is_simple())
+		bowtie = [Point2(0,0), Point2(2,2), Point2(2,0), Point2(0,2)]
+		self.assertEqual(Polygon2(bowtie).intersecting_edges(),
+			(Segment2(Point2(0,0), Point2(2,2)), Segment2(Point2(2,0), Point2(0,2))))
+		# a vertex on another edge, a repeated vertex, a spike folding back
+		# onto its edge and collinear vertices along a straight edge
+		self.assertFalse(Polygon2([Point2(0,0), Point2(4,0), Point2(2,0), Point2(2,3)]).is_simple())
+		self.assertFalse(Polygon2([Point2(0,0), Point2(2,0), Point2(1,1), Point2(2,2),
+			Point2(0,2), Point2(1,1)]).is_simple())
+		self.assertFalse(Polygon2([Point2(0,0), Point2(4,0), Point2(4,4), Point2(4,2)]).is_simple())
+		self.assertTrue(Polygon2([Point2(0,0), Point2(2,0), Point2(4,0), Point2(4,4)]).is_simple())
+		self.assertFalse(Polygon2([Point2(0,0), Point2(1,1)]).is_simple())
+		self.assertFalse(Polygon2([Point2(0,0), Point2(4,0), Point2(4,0), Point2(0,4)]).is_simple())
+
+class TestHeadlessImport(unittest.TestCase):
+	def test_no_pygame(self):
+		# a fresh interpreter, so that nothing else has loaded pygame yet
+		script = 'import sys, pycompgeom; pycompgeom.andrew(pycompgeom.random_points(10)); ' \
+			'print "pygame" in sys.modules'
+		self.assertEqual(subprocess.check_output([sys.executable, '-c', script]).strip(), 'False')
+		
 if __name__ == '__main__':
 	unittest.main(verbosity=2)
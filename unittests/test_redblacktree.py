@@ -0,0 +1,276 @@
+from pycompgeom.RedBlackTree import RedBlackTree
+
+import bisect
+import random
+import unittest
+
+class TestRedBlackTree(unittest.TestCase):
+
+	def setUp(self):
+		self.keys = range(200) * 2
+		random.shuffle(self.keys)
+		self.tree = RedBlackTree()
+		for k in self.keys:
+			self.tree.insert(k, str(k))
+
+	def entries(self):
+		entries = []
+		self.tree.processAll(lambda key, data: entries.append((key, data)))
+		return entries
+
+	def test_insert(self):
+		self.assertEqual(len(self.tree), 400)
+		self.assertTrue(self.tree._validate() > 0)
+		self.assertEqual(self.entries(), [(k, str(k)) for k in sorted(self.keys)])
+		self.assertTrue(5 in self.tree)
+		self.assertFalse(5.5 in self.tree)
+
+	def test_find(self):
+		self.assertEqual(self.tree.find(7), '7')
+		self.assertRaises(KeyError, self.tree.find, 7.5)
+		self.assertEqual(self.tree.findAll(7), [(7, '7'), (7, '7')])
+		self.assertEqual(self.tree.findAll(7.5), [])
+		self.assertEqual(self.tree.findLow(7.5), (7, '7'))
+		self.assertEqual(self.tree.findLow(7), (7, '7'))
+		self.assertEqual(self.tree.findLow(-1), None)
+		self.assertEqual(self.tree.findHigh(7.5), (8, '8'))
+		self.assertEqual(self.tree.findHigh(7), (7, '7'))
+		self.assertEqual(self.tree.findHigh(200), None)
+		self.assertEqual(self.tree.findMin(), (0, '0'))
+		self.assertEqual(self.tree.findMax(), (199, '199'))
+
+	def test_remove(self):
+		removed = self.keys[:250]
+		for k in removed:
+			self.assertEqual(self.tree.remove(k), str(k))
+			self.assertTrue(self.tree._validate() >= 0)
+		left = sorted(self.keys[250:])
+		self.assertEqual(self.entries(), [(k, str(k)) for k in left])
+		self.assertRaises(KeyError, self.tree.remove, 1000)
+		self.assertEqual(self.tree.removeMin(), (left[0], str(left[0])))
+		self.assertEqual(self.tree.removeMax(), (left[-1], str(left[-1])))
+		self.assertEqual(len(self.tree), len(left) - 2)
+		key = left[len(left) // 2]
+		self.assertEqual(self.tree.removeAll(key), [str(key)] * left[1:-1].count(key))
+		self.assertFalse(key in self.tree)
+		while self.tree:
+			self.tree.removeMin()
+			self.assertTrue(self.tree._validate() >= 0)
+		self.assertRaises(RuntimeError, self.tree.removeMin)
+		self.assertEqual(self.tree.findLow(3), None)
+
+	def test_comparator(self):
+		tree = RedBlackTree(lambda a, b: cmp(b, a))
+		for k in self.keys:
+			tree.insert(k)
+		self.assertEqual(tree.findMin()[0], 199)
+		self.assertEqual(tree.findLow(7.5)[0], 8)
+
+	def test_key(self):
+		calls = []
+		def key(k):
+			calls.append(k)
+			return -k
+		tree = RedBlackTree(key=key)
+		for k in self.keys:
+			tree.insert(k, k)
+		# one call per insertion, none for the stored keys
+		self.assertEqual(len(calls), len(self.keys))
+		self.assertEqual(tree.findMin(), (199, 199))
+		self.assertEqual(tree.findLow(7.5), (8, 8))
+		self.assertEqual(tree.findHigh(7.5), (7, 7))
+		for k in self.keys[:300]:
+			tree.remove(k)
+			self.assertTrue(tree._validate() >= 0)
+		entries = []
+		tree.processAll(lambda key, data: entries.append(key))
+		self.assertEqual(entries, sorted(self.keys[300:], reverse=True))
+
+	def test_sweep(self):
+		# lines y = a + b x that never cross for 0 <= x <= 10
+		lines = [(3 * a, random.random() / 5) for a in range(100)]
+		random.shuffle(lines)
+		calls = [0]
+		def height(line, x):
+			calls[0] += 1
+			return line[0] + line[1] * x
+		tree = RedBlackTree(key=height, sweep=True)
+		for x, line in enumerate(lines):
+			tree.setPosition(x % 10)
+			tree.insert(line, line)
+		tree.setPosition(5)
+		ordered = []
+		tree.processAll(lambda key, data: ordered.append(key))
+		self.assertEqual(ordered, sorted(lines))
+		self.assertEqual(tree.findLow((4.5, 0))[0][0], 3)
+		self.assertEqual(tree.findHigh((4.5, 0))[0][0], 6)
+		# stored values are cached until the position moves
+		before = calls[0]
+		tree.findHigh((4.5, 0))
+		self.assertEqual(calls[0] - before, 1)
+		tree.setPosition(5)
+		tree.findHigh((4.5, 0))
+		self.assertEqual(calls[0] - before, 2)
+		tree.setPosition(6)
+		tree.findHigh((4.5, 0))
+		self.assertTrue(calls[0] - before > 3)
+		for line in lines[:50]:
+			tree.remove(line)
+			self.assertTrue(tree._validate() >= 0)
+		self.assertEqual(len(tree), 50)
+		# four lines crossing at (0.5, 0.5); keys that tie on height are
+		# kept apart, ordered by cmp
+		crossing = [(0, 1), (1, -1), (0.5, 0), (2, -3)]
+		tree = RedBlackTree(key=height, sweep=True)
+		tree.setPosition(0)
+		for line in crossing:
+			tree.insert(line, line)
+		tree.setPosition(0.5)
+		self.assertEqual(len(tree), 4)
+		for line in crossing:
+			self.assertEqual(tree.find(line), line)
+			self.assertEqual(tree.findAll(line), [(line, line)])
+		self.assertEqual(tree.remove((1, -1)), (1, -1))
+		self.assertFalse((1, -1) in tree)
+		self.assertTrue((0, 1) in tree)
+		self.assertTrue(tree._validate() > 0)
+		# past the crossing, as a sweep does, take them out and put them back
+		for line in [(0, 1), (0.5, 0), (2, -3)]:
+			self.assertEqual(tree.remove(line), line)
+			tree.setPosition(1)
+			tree.insert(line, line)
+			tree.setPosition(0.5)
+		tree.setPosition(1)
+		ordered = []
+		tree.processAll(lambda key, data: ordered.append(key))
+		self.assertEqual(ordered, [(2, -3), (0.5, 0), (0, 1)])
+		# a line touching another at its endpoint
+		tree.insert((1.5, -1), 'touching')
+		self.assertEqual(tree.find((1.5, -1)), 'touching')
+		self.assertEqual(tree.find((0.5, 0)), (0.5, 0))
+		self.assertEqual(len(tree), 4)
+
+	def test_from_sorted(self):
+		for n in range(1, 40):
+			tree = RedBlackTree.from_sorted((k, k) for k in range(n))
+			self.assertTrue(tree._validate() > 0)
+			self.assertEqual(len(tree), n)
+		items = [(k, str(k)) for k in sorted(self.keys)]
+		tree = RedBlackTree.from_sorted(items)
+		self.assertTrue(tree._validate() > 0)
+		self.assertEqual(len(tree), 400)
+		self.assertEqual(tree.findAll(7), [(7, '7'), (7, '7')])
+		self.assertEqual(tree.findLow(7.5), (7, '7'))
+		tree.insert(7.5, '7.5')
+		tree.remove(3)
+		self.assertTrue(tree._validate() > 0)
+		self.assertRaises(ValueError, RedBlackTree.from_sorted, [(2, 2), (1, 1)])
+		tree = RedBlackTree.from_sorted([(k, k) for k in range(10, 0, -1)], key=lambda k: -k)
+		self.assertEqual(tree.findMin(), (10, 10))
+
+	def test_extend(self):
+		extra = [(k + 0.5, k) for k in range(-10, 250, 2)] + [(k, str(k)) for k in range(300, 310)]
+		self.tree.extend(extra)
+		self.assertTrue(self.tree._validate() > 0)
+		self.assertEqual(len(self.tree), 400 + len(extra))
+		self.assertEqual(self.entries(), sorted([(k, str(k)) for k in self.keys] + extra))
+		self.tree.extend([(7, 'seven')])
+		self.assertEqual(len(self.tree.findAll(7)), 3)
+		self.tree.extend([(k, str(k)) for k in range(200)])
+		self.assertTrue(self.tree._validate() > 0)
+		self.assertEqual(len(self.tree.findAll(7)), 4)
+		# unsorted keys are refused before anything is inserted, however
+		# few they are
+		size = len(self.tree)
+		self.assertRaises(ValueError, self.tree.extend, [(5, 'a'), (3, 'b')])
+		self.assertRaises(ValueError, self.tree.extend, [(k, k) for k in range(300, 0, -1)])
+		self.assertEqual(len(self.tree), size)
+
+	def test_ranks(self):
+		tree = RedBlackTree(ranks=True)
+		for k in self.keys:
+			tree.insert(k, str(k))
+		self.assertTrue(tree._validate() > 0)
+		self.assertRaises(RuntimeError, self.tree.rank, 3)
+		left = sorted(self.keys)
+		for k in self.keys[:150]:
+			tree.remove(k)
+			left.remove(k)
+			self.assertTrue(tree._validate() > 0)
+		tree.removeAll(left[0])
+		left = [k for k in left if k != left[0]]
+		tree.extend([(k + 0.5, str(k + 0.5)) for k in range(0, 200, 3)])
+		self.assertTrue(tree._validate() > 0)
+		left = sorted(left + [k + 0.5 for k in range(0, 200, 3)])
+		self.assertEqual(len(tree), len(left))
+		for key in [-1, 0, 3.5, 7, 7.25, 100, 199, 250]:
+			self.assertEqual(tree.rank(key), bisect.bisect_left(left, key))
+		for k in range(len(left)):
+			self.assertEqual(tree.select(k)[0], left[k])
+		self.assertEqual(tree.select(-1)[0], left[-1])
+		self.assertRaises(IndexError, tree.select, len(left))
+		for lo, hi in [(0, 199), (7, 7), (3.5, 20.25), (-5, -1), (10, 5), (150, 1000)]:
+			expected = bisect.bisect_right(left, hi) - bisect.bisect_left(left, lo)
+			self.assertEqual(tree.count_range(lo, hi), max(0, expected))
+		tree = RedBlackTree.from_sorted([(k, k) for k in sorted(self.keys)], ranks=True)
+		self.assertTrue(tree._validate() > 0)
+		self.assertEqual(tree.count_range(10, 19), 20)
+		self.assertEqual(tree.select(21), (10, 10))
+
+	def test_items(self):
+		ordered = sorted(self.keys)
+		self.assertEqual([k for k, d in self.tree.items()], ordered)
+		self.assertEqual([k for k, d in self.tree.items(reverse=True)], ordered[::-1])
+		self.assertEqual([k for k, d in self.tree.items(10, 12)], [10, 10, 11, 11, 12, 12])
+		self.assertEqual([k for k, d in self.tree.items(9.5, 11.5, True)], [11, 11, 10, 10])
+		self.assertEqual([k for k, d in self.tree.items(hi=1)], [0, 0, 1, 1])
+		self.assertEqual([k for k, d in self.tree.items(lo=198.5)], [199, 199])
+		self.assertEqual(list(self.tree.items(5.2, 5.8)), [])
+		self.assertEqual(list(RedBlackTree().items()), [])
+		# stopping early
+		found = None
+		for key, data in self.tree.items(50):
+			if key % 7 == 0:
+				found = key
+				break
+		self.assertEqual(found, 56)
+		tree = RedBlackTree(key=lambda k: -k)
+		tree.extend((k, k) for k in range(10, 0, -1))
+		self.assertEqual([k for k, d in tree.items(8, 5)], [8, 7, 6, 5])
+
+	def test_successor(self):
+		self.assertEqual(self.tree.successor(7), (8, '8'))
+		self.assertEqual(self.tree.successor(7.5), (8, '8'))
+		self.assertEqual(self.tree.successor(-3), (0, '0'))
+		self.assertEqual(self.tree.successor(199), None)
+		self.assertEqual(self.tree.predecessor(7), (6, '6'))
+		self.assertEqual(self.tree.predecessor(7.5), (7, '7'))
+		self.assertEqual(self.tree.predecessor(300), (199, '199'))
+		self.assertEqual(self.tree.predecessor(0), None)
+		self.assertEqual(RedBlackTree().successor(1), None)
+
+	def test_iterate_while_updating(self):
+		seen = []
+		for key, data in self.tree.items(reverse=True):
+			seen.append(key)
+			if key % 10 == 0:
+				self.tree.insert(key + 0.5, 'behind')
+				self.tree.insert(key - 0.5, 'ahead')
+			if key % 10 == 5:
+				self.tree.removeAll(key)
+				self.tree.remove(key - 2)
+		self.assertTrue(self.tree._validate() > 0)
+		expected = []
+		for k in range(199, -1, -1):
+			if k % 10 == 3:
+				expected.append(k)
+			elif k % 10 == 0:
+				expected += [k, k, k - 0.5, k - 0.5]
+			elif k % 10 == 5:
+				expected.append(k)
+			else:
+				expected += [k, k]
+		self.assertEqual(seen, expected)
+
+if __name__ == '__main__':
+	unittest.main(verbosity=2)
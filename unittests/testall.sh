@@ -3,3 +3,8 @@ export PYTHONPATH="/home/christodoulos/Dropbox/research/python/pycompgeom"
 python test_primitives.py 
 python test_predicates.py
 python test_algorithms.py
+python test_pointsets.py
+python test_calipers.py
+python test_intersections.py
+python test_generators.py
+python test_redblacktree.py